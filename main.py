@@ -25,11 +25,2483 @@ Copyright (c) 2026
 # ------------------------------------------------------------------------------------------
 
 import cv2
+import numpy as np
 import sys
 import time
 import os
 import argparse
+import math
 import shutil
+import re
+import signal
+import select
+import queue
+import threading
+import multiprocessing
+import logging
+import zlib
+import json
+import mmap
+import hashlib
+import tempfile
+import struct
+from multiprocessing import shared_memory
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Zero-padded decimal digits for every value 0..999, indexed by the value itself.
+# Lets the renderers emit escape sequences (colors, cursor positions) as
+# fixed-width byte fields without formatting a string per cell.
+DIGITS3 = np.array([list(b"%03d" % i) for i in range(1000)], dtype=np.uint8)
+
+# SGR templates for each color depth. Digit fields are zero-padded to three
+# characters so every sequence has a fixed width:
+#   TrueColor: \033[38;2;RRR;GGG;BBBm (19 bytes)
+#   256-color: \033[38;5;NNNm         (11 bytes)
+#   16-color:  \033[NNNm              (7 bytes, NNN = 030-037 / 090-097)
+TRUECOLOR_SGR = b"\033[38;2;000;000;000m"
+PALETTE256_SGR = b"\033[38;5;000m"
+PALETTE16_SGR = b"\033[000m"
+COLOR_RESET = b"\033[0m"
+CURSOR_HOME = b"\033[H"
+CLEAR_SCREEN = b"\033[2J"
+SYNC_BEGIN = b"\033[?2026h" # DEC private mode 2026: hold the display until SYNC_END
+SYNC_END = b"\033[?2026l"
+
+# Upper half block: foreground paints the top pixel, background the bottom one
+UPPER_HALF_BLOCK = np.frombuffer("\u2580".encode("utf-8"), dtype=np.uint8)
+
+# Braille patterns (U+2800-U+28FF): (row, column) of the dot behind each bit of
+# the code point offset, within the 2x4 block a cell covers
+BRAILLE_DOTS = ((0, 0), (1, 0), (2, 0), (0, 1), (1, 1), (2, 1), (3, 0), (3, 1))
+
+# Fixed-width absolute cursor position: \033[RRR;CCCH (1-based row;column)
+CURSOR_POSITION = b"\033[000;000H"
+
+# xterm default RGB values of the 16 system colors and their foreground SGR codes
+ANSI16_RGB = [
+    (0, 0, 0), (205, 0, 0), (0, 205, 0), (205, 205, 0),
+    (0, 0, 238), (205, 0, 205), (0, 205, 205), (229, 229, 229),
+    (127, 127, 127), (255, 0, 0), (0, 255, 0), (255, 255, 0),
+    (92, 92, 255), (255, 0, 255), (0, 255, 255), (255, 255, 255),
+]
+ANSI16_SGR = list(range(30, 38)) + list(range(90, 98))
+
+# Resolution of the RGB -> palette lookup tables (6 bits = 64x64x64 bins)
+PALETTE_LUT_BITS = 6
+PALETTE_LUT_STRIDES = np.array([1 << (2 * PALETTE_LUT_BITS), 1 << PALETTE_LUT_BITS, 1], dtype=np.intp)
+
+
+def default_cache_dir():
+    """Per-user cache directory for precomputed tables (honours XDG_CACHE_HOME)."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "pixelstream")
+
+
+def xterm256_rgb():
+    """RGB values of the 256 xterm colors: 16 system colors, 6x6x6 cube, 24 grays."""
+    levels = (0, 95, 135, 175, 215, 255)
+    cube = [(r, g, b) for r in levels for g in levels for b in levels]
+    grays = [(v, v, v) for v in range(8, 248, 10)]
+    return np.array(ANSI16_RGB + cube + grays, dtype=np.int32)
+
+
+def build_palette_lut(palette_rgb, codes, bits=PALETTE_LUT_BITS):
+    """
+    Maps every RGB bin to the SGR code of its nearest palette color.
+
+    Distances are weighted towards green, where the eye is most sensitive.
+    The search runs one red plane at a time to keep memory use modest.
+
+    Returns:
+        np.ndarray: (2^bits, 2^bits, 2^bits) uint8 table indexed by [r, g, b] >> (8 - bits).
+    """
+    size = 1 << bits
+    centers = (np.arange(size) << (8 - bits)) + (1 << (7 - bits))
+    codes = np.asarray(codes, dtype=np.uint8)
+    
+    # Weighted squared distance |x - p|^2 = |x|^2 - 2 x.p + |p|^2 after scaling the
+    # axes by sqrt(weight); |x|^2 is constant per bin, so the argmin is one matmul.
+    scale = np.sqrt(np.array([2.0, 4.0, 3.0], dtype=np.float32))
+    palette = palette_rgb.astype(np.float32) * scale
+    palette_norm = (palette ** 2).sum(axis=1)
+    gg, bb = np.meshgrid(centers, centers, indexing="ij")
+    
+    lut = np.empty((size, size, size), dtype=np.uint8)
+    for r_bin, r in enumerate(centers):
+        plane = np.stack([np.full_like(gg, r), gg, bb], axis=-1).reshape(-1, 3).astype(np.float32) * scale
+        dist = palette_norm - 2 * (plane @ palette.T)
+        lut[r_bin] = codes[dist.argmin(axis=1)].reshape(size, size)
+    return lut
+
+
+def load_cached_table(filename, build, cache_dir=None):
+    """
+    Returns a precomputed NumPy table, building it once and caching it on disk.
+
+    Tables such as the nearest-palette LUTs take a noticeable fraction of a second
+    to compute, so they are stored as .npy and later runs only pay for loading
+    them. An unwritable cache directory is not an error; the table is then simply
+    rebuilt on every run.
+    """
+    cache_dir = cache_dir or default_cache_dir()
+    path = os.path.join(cache_dir, filename)
+    try:
+        return np.load(path)
+    except (OSError, ValueError):
+        pass
+    
+    table = build()
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, table)
+        os.replace(tmp_path, path) # Atomic: concurrent players never see a partial file
+    except OSError:
+        pass
+    return table
+
+
+def load_palette_lut(name, palette_rgb, codes, cache_dir=None):
+    """Returns the RGB -> palette LUT for a color depth, from the disk cache when possible."""
+    return load_cached_table(f"lut_{name}_{PALETTE_LUT_BITS}bit.npy",
+                             lambda: build_palette_lut(palette_rgb, codes), cache_dir)
+
+
+def bayer_matrix(size=8):
+    """Ordered-dither Bayer threshold matrix with values in [0, 1)."""
+    matrix = np.zeros((1, 1), dtype=np.int64)
+    while matrix.shape[0] < size:
+        matrix = np.block([[4 * matrix, 4 * matrix + 2], [4 * matrix + 3, 4 * matrix + 1]])
+    return (matrix + 0.5) / matrix.size
+
+
+def build_blue_noise(size=32, sigma=1.9, seed=0):
+    """
+    Blue-noise threshold matrix with values in [0, 1), via void-and-cluster.
+
+    Pixels are ranked by repeatedly removing the tightest cluster of an initial
+    relaxed pattern and then filling the largest void, measured with a toroidal
+    Gaussian energy that is updated incrementally after every step.
+    """
+    n = size * size
+    dist = np.minimum(np.arange(size), size - np.arange(size))
+    kernel = np.exp(-(dist[:, None] ** 2 + dist[None, :] ** 2) / (2 * sigma ** 2)).ravel()
+    
+    def splat(energy, index, sign):
+        y, x = divmod(index, size)
+        energy += sign * np.roll(kernel.reshape(size, size), (y, x), axis=(0, 1)).ravel()
+    
+    rng = np.random.default_rng(seed)
+    pattern = np.zeros(n, dtype=bool)
+    energy = np.zeros(n)
+    for index in rng.choice(n, n // 10, replace=False):
+        pattern[index] = True
+        splat(energy, index, 1)
+    
+    # 1. Relax the initial pattern: move the tightest cluster into the largest void
+    while True:
+        cluster = int(np.argmax(np.where(pattern, energy, -np.inf)))
+        pattern[cluster] = False
+        splat(energy, cluster, -1)
+        void = int(np.argmin(np.where(pattern, np.inf, energy)))
+        pattern[void] = True
+        splat(energy, void, 1)
+        if void == cluster:
+            break
+    
+    # 2. Rank the initial ones by removing tightest clusters, then fill largest voids
+    ranks = np.empty(n, dtype=np.int64)
+    ones = int(pattern.sum())
+    remaining, remaining_energy = pattern.copy(), energy.copy()
+    for rank in range(ones - 1, -1, -1):
+        cluster = int(np.argmax(np.where(remaining, remaining_energy, -np.inf)))
+        remaining[cluster] = False
+        splat(remaining_energy, cluster, -1)
+        ranks[cluster] = rank
+    for rank in range(ones, n):
+        void = int(np.argmin(np.where(pattern, np.inf, energy)))
+        pattern[void] = True
+        splat(energy, void, 1)
+        ranks[void] = rank
+    return (ranks.reshape(size, size) + 0.5) / n
+
+
+def dither_matrix(name, cache_dir=None):
+    """Returns the threshold matrix for a dither mode ("bayer" or "bluenoise")."""
+    if name == "bayer":
+        return bayer_matrix()
+    if name == "bluenoise":
+        return load_cached_table("bluenoise_32.npy", build_blue_noise, cache_dir)
+    raise ValueError(f"Unsupported dither mode: {name}")
+
+
+class SgrPalette:
+    """
+    Fixed-width SGR layout for one terminal color depth.
+
+    Every `000` field of the template is a 3-digit slot filled from per-cell
+    values: the R, G, B channels for TrueColor, or the SGR code looked up through
+    a precomputed RGB -> palette table for the 256 and 16 color modes.
+    """
+
+    def __init__(self, name, template, lut=None, background_offset=0, dither_spread=0):
+        """
+        Args:
+            name (str): Color depth name ("truecolor", "256", "16").
+            template (bytes): Foreground SGR sequence with `000` digit placeholders.
+            lut (np.ndarray, optional): RGB -> SGR code table; None for TrueColor.
+            background_offset (int): Added to LUT codes for the background variant (16 colors).
+            dither_spread (int): Amplitude of ordered-dither offsets, about one palette step.
+        """
+        self.name = name
+        self.template = template
+        self.lut = lut
+        self.background_offset = background_offset
+        self.dither_spread = dither_spread
+        self.sgr_template = np.frombuffer(template, dtype=np.uint8)
+        self.slots = [match.start() for match in re.finditer(b"000", template)]
+
+    @property
+    def width(self):
+        """Length in bytes of one SGR sequence."""
+        return len(self.template)
+
+    def background(self):
+        """Returns the matching background palette (48;2 / 48;5 / codes 40-47 and 100-107)."""
+        lut = self.lut if self.lut is None else self.lut + np.uint8(self.background_offset)
+        return SgrPalette(self.name, self.template.replace(b"[38;", b"[48;"), lut,
+                          dither_spread=self.dither_spread)
+
+    def values(self, rgb, ctx=None, name="values"):
+        """
+        Per-cell digit values (H, W, C): RGB for TrueColor, palette codes otherwise.
+
+        The palette lookup is a single take() on the flattened LUT. With a render
+        context, the bin and index intermediates and the result reuse its arrays
+        and the lookup runs in row bands on its stripe pool.
+        """
+        if self.lut is None:
+            return rgb
+        shape = rgb.shape[:2]
+        bins = ctx.array(f"{name}_bins", rgb.shape) if ctx else np.empty(rgb.shape, dtype=np.uint8)
+        index = ctx.array(f"{name}_index", shape, np.intp) if ctx else np.empty(shape, dtype=np.intp)
+        values = ctx.array(name, shape + (1,)) if ctx else np.empty(shape + (1,), dtype=np.uint8)
+        
+        def lookup(start, stop):
+            np.right_shift(rgb[start:stop], 8 - PALETTE_LUT_BITS, out=bins[start:stop])
+            np.dot(bins[start:stop], PALETTE_LUT_STRIDES, out=index[start:stop])
+            np.take(self.lut.reshape(-1), index[start:stop], out=values[start:stop, :, 0], mode="clip")
+        
+        if ctx:
+            ctx.striped(lookup, shape[0])
+        else:
+            lookup(0, shape[0])
+        return values
+
+    def fill(self, cells, values):
+        """Writes the digit fields of an (H, W, width) view of SGR bytes in place."""
+        for channel, start in enumerate(self.slots):
+            np.take(DIGITS3, values[:, :, channel], axis=0, out=cells[:, :, start:start + 3], mode="clip")
+
+    def sgr(self, values):
+        """Builds the fixed-width SGR sequences (N, width) for (N, C) values."""
+        sgr = np.empty((len(values), self.width), dtype=np.uint8)
+        sgr[:] = self.sgr_template
+        for channel, start in enumerate(self.slots):
+            sgr[:, start:start + 3] = DIGITS3[values[:, channel]]
+        return sgr
+
+
+TRUECOLOR = SgrPalette("truecolor", TRUECOLOR_SGR)
+
+
+def make_palette(name, cache_dir=None):
+    """Returns the SgrPalette for a color depth ("truecolor", "256" or "16")."""
+    if name == "truecolor":
+        return TRUECOLOR
+    if name == "256":
+        # System colors 0-15 are re-themed by most terminals, so only map to the cube and grays
+        lut = load_palette_lut("xterm256", xterm256_rgb()[16:], np.arange(16, 256), cache_dir)
+        return SgrPalette(name, PALETTE256_SGR, lut, dither_spread=40)
+    if name == "16":
+        lut = load_palette_lut("ansi16", np.array(ANSI16_RGB, dtype=np.int32), ANSI16_SGR, cache_dir)
+        return SgrPalette(name, PALETTE16_SGR, lut, background_offset=10, dither_spread=128)
+    raise ValueError(f"Unsupported color depth: {name}")
+
+
+def pack_keys(values):
+    """Packs per-cell SGR values (H, W, C) into (H, W) integer keys for run/diff comparisons."""
+    keys = values[:, :, 0].astype(np.uint64 if values.shape[2] > 4 else np.uint32)
+    for channel in range(1, values.shape[2]):
+        keys = (keys << 8) | values[:, :, channel]
+    return keys
+
+
+class SgrLayer:
+    """One color attribute (foreground or background) of a cell grid."""
+
+    def __init__(self, palette, values):
+        """
+        Args:
+            palette (SgrPalette): Color depth and SGR layout of this attribute.
+            values (np.ndarray): (H, W, C) per-cell digit values for the palette.
+        """
+        self.palette = palette
+        self.values = values
+        self._keys = None
+
+    @property
+    def keys(self):
+        """(H, W) integer keys; equal keys mean the attribute need not be re-sent."""
+        if self._keys is None:
+            self._keys = pack_keys(self.values)
+        return self._keys
+
+    def sgr(self, ys, xs):
+        """SGR bytes (N, width) for the cells at (ys, xs)."""
+        return self.palette.sgr(self.values[ys, xs])
+
+
+class CellGrid:
+    """
+    One frame as terminal cells: glyph bytes plus zero or more SGR color layers.
+
+    Mono grids have no layers and colored ASCII has a foreground layer. Half-block
+    cells carry separate foreground and background layers, so each is coalesced on
+    its own and a change in one never forces re-sending the other.
+    """
+
+    def __init__(self, glyphs, layers=()):
+        """
+        Args:
+            glyphs (np.ndarray): (H, W, G) glyph bytes per cell (UTF-8, fixed width G).
+            layers (iterable): SgrLayer attributes, emitted in order before each glyph.
+        """
+        self.glyphs = glyphs
+        self.layers = list(layers)
+
+    @property
+    def row_end(self):
+        """Bytes terminating a row in a full frame: color reset (if any) and line feed."""
+        return (COLOR_RESET if self.layers else b"") + b"\n"
+
+    @property
+    def cell_template(self):
+        """Fixed-width per-cell template: every layer's SGR followed by glyph placeholders."""
+        return b"".join(layer.palette.template for layer in self.layers) + b" " * self.glyphs.shape[2]
+
+    def fixed_frame_size(self):
+        """Size in bytes of this frame in the one-sequence-per-cell encoding."""
+        h, w, _ = self.glyphs.shape
+        return h * (w * len(self.cell_template) + len(self.row_end)) - 1
+
+
+def color_run_heads(keys):
+    """Marks cells whose color differs from their left neighbour (column 0 always counts)."""
+    heads = np.ones(keys.shape, dtype=bool)
+    np.not_equal(keys[:, 1:], keys[:, :-1], out=heads[:, 1:])
+    return heads
+
+
+def encode_cells(grid, emit=None, row_end=b""):
+    """
+    Encodes a cell grid, emitting each SGR layer only where its color changes.
+
+    Without an `emit` mask every row is written in order and terminated by
+    `row_end`. With a mask only the selected cells are written, and every
+    horizontal span of them starts with a fixed-width cursor-position sequence.
+    Run boundaries, output offsets and the final scatter are all computed with
+    NumPy, so the cost does not depend on how many runs or spans a frame contains.
+
+    Args:
+        grid (CellGrid): Glyphs and color layers of the frame.
+        emit (np.ndarray, optional): (H, W) bool mask of cells to write.
+        row_end (bytes): Bytes terminating every row (reset, line feed).
+
+    Returns:
+        np.ndarray: Flat uint8 array with the encoded cells.
+    """
+    glyphs = grid.glyphs
+    h, w, glyph_len = glyphs.shape
+    cursor_len = len(CURSOR_POSITION)
+
+    # 1. Spans: every run of emitted cells needs a cursor jump to its first cell
+    if emit is None:
+        emit = np.ones((h, w), dtype=bool)
+        starts = np.zeros((h, w), dtype=bool)
+    else:
+        starts = emit.copy()
+        starts[:, 1:] &= ~emit[:, :-1]
+
+    # 2. Run heads per layer: emitted cells whose color differs from the cell written before them
+    heads = []
+    sizes = np.empty((h, w + 1), dtype=np.int64)
+    sizes[:, :w] = glyph_len * emit + cursor_len * starts
+    for layer in grid.layers:
+        layer_heads = color_run_heads(layer.keys)
+        layer_heads |= starts
+        layer_heads &= emit
+        heads.append(layer_heads)
+        sizes[:, :w] += layer.palette.width * layer_heads
+
+    # 3. Byte offset of every cell (and of the row terminator) from the cell sizes
+    sizes[:, w] = len(row_end)
+    offsets = np.cumsum(sizes, axis=None).reshape(h, w + 1) - sizes
+    out = np.empty(int(offsets[-1, -1]) + len(row_end), dtype=np.uint8)
+
+    # 4. Scatter cursor jumps, SGR heads, glyphs and row terminators into one flat buffer
+    start_y, start_x = np.nonzero(starts)
+    if len(start_y):
+        jumps = np.empty((len(start_y), cursor_len), dtype=np.uint8)
+        jumps[:] = np.frombuffer(CURSOR_POSITION, dtype=np.uint8)
+        jumps[:, 2:5] = DIGITS3[start_y + 1]
+        jumps[:, 6:9] = DIGITS3[start_x + 1]
+        out[offsets[start_y, start_x][:, None] + np.arange(cursor_len)] = jumps
+    write_at = offsets[:, :w] + cursor_len * starts
+    for layer, layer_heads in zip(grid.layers, heads):
+        head_y, head_x = np.nonzero(layer_heads)
+        out[write_at[head_y, head_x][:, None] + np.arange(layer.palette.width)] = layer.sgr(head_y, head_x)
+        write_at += layer.palette.width * layer_heads
+    if emit.all():
+        out[write_at[:, :, None] + np.arange(glyph_len)] = glyphs
+    else:
+        emit_y, emit_x = np.nonzero(emit)
+        out[write_at[emit_y, emit_x][:, None] + np.arange(glyph_len)] = glyphs[emit_y, emit_x]
+    if row_end:
+        out[offsets[:, w][:, None] + np.arange(len(row_end))] = np.frombuffer(row_end, dtype=np.uint8)
+
+    return out
+
+
+def encode_full_frame(grid):
+    """Encodes a whole cell grid from the home position, one line per row (used for redraws)."""
+    return CURSOR_HOME + encode_cells(grid, row_end=grid.row_end)[:-1].tobytes()
+
+
+class DamageTracker:
+    """
+    Cell-level damage tracking.
+
+    Keeps the glyph and color grid last sent to the terminal and encodes each new
+    frame as cursor-addressed spans covering only the cells that changed. A full
+    frame is sent periodically (and whenever it is cheaper than the delta) so that
+    any drift between our model and the real terminal contents stays bounded.
+    """
+
+    def __init__(self, refresh_interval=300):
+        """
+        Args:
+            refresh_interval (int): Force a full redraw every N frames (0 disables).
+        """
+        self.refresh_interval = refresh_interval
+        self.glyphs = None
+        self.keys = None
+        self.frames_since_refresh = 0
+        self.keyframe = False # Whether the last encoded frame was drawn in full
+
+    def reset(self):
+        """Forgets the displayed grid so the next frame is drawn in full."""
+        self.glyphs = None
+        self.keys = None
+
+    def _emit_mask(self, changed, grid):
+        """
+        Extends the changed-cell mask across short gaps.
+
+        Between two changed cells on the same row we either jump over the unchanged
+        gap with a cursor-position sequence (and restart the color runs), or rewrite
+        the gap cells in place. The gap is merged whenever rewriting it is cheaper.
+        """
+        h, w = changed.shape
+        cols = np.arange(w)
+        glyph_len = grid.glyphs.shape[2]
+
+        # Cost of writing each cell inside a contiguous span (glyph + SGR on color change)
+        cost = np.full((h, w), glyph_len, dtype=np.int64)
+        for layer in grid.layers:
+            cost += layer.palette.width * color_run_heads(layer.keys)
+        cum_cost = np.cumsum(cost, axis=1)
+
+        # Nearest changed cell to the left of every cell (-1 if none)
+        prev_changed = np.where(changed, cols, -1)
+        np.maximum.accumulate(prev_changed, axis=1, out=prev_changed)
+        before = np.full((h, w), -1, dtype=np.int64)
+        before[:, 1:] = prev_changed[:, :-1]
+
+        # A gap ends at a changed cell x whose previous changed cell is not x - 1
+        gap_end = changed & (before >= 0) & (before < cols - 1)
+        end_y, end_x = np.nonzero(gap_end)
+        start_x = before[end_y, end_x]
+        rewrite = cum_cost[end_y, end_x] - cum_cost[end_y, start_x]
+        jump = len(CURSOR_POSITION) + glyph_len + sum(layer.palette.width for layer in grid.layers)
+        merged = np.zeros((h, w), dtype=bool)
+        merged[end_y, end_x] = rewrite < jump
+
+        # Fill every unchanged cell whose enclosing gap was merged
+        next_changed = np.where(changed, cols, w)
+        next_changed = np.minimum.accumulate(next_changed[:, ::-1], axis=1)[:, ::-1]
+        inside = ~changed & (prev_changed >= 0) & (next_changed < w)
+        gap_merged = np.take_along_axis(merged, np.minimum(next_changed, w - 1), axis=1)
+        return changed | (inside & gap_merged)
+
+    def encode(self, grid, stats=None):
+        """
+        Encodes a frame against the previously displayed one.
+
+        Args:
+            grid (CellGrid): Glyphs and color layers of the new frame.
+            stats (Counter, optional): Receives changed-cell and refresh counters.
+
+        Returns:
+            bytes: Terminal output for this frame (empty if nothing changed).
+        """
+        glyphs = grid.glyphs
+        h, w, glyph_len = glyphs.shape
+        keys = [layer.keys for layer in grid.layers]
+        full_frame = None
+
+        stale = (self.glyphs is None or self.glyphs.shape != glyphs.shape
+                 or [k.dtype for k in self.keys] != [k.dtype for k in keys]
+                 # The last full frame counts towards the interval, so redraws come every N frames
+                 or (self.refresh_interval and self.frames_since_refresh + 1 >= self.refresh_interval))
+
+        if not stale:
+            changed = np.any(glyphs != self.glyphs, axis=2)
+            for layer_keys, previous in zip(keys, self.keys):
+                changed |= layer_keys != previous
+            emit = self._emit_mask(changed, grid)
+            encoded = encode_cells(grid, emit=emit)
+            if stats is not None:
+                stats["damage_cells_changed"] += int(changed.sum())
+                stats["damage_cells"] += h * w
+
+            # Scene cuts: fall back to a full redraw when the delta is not smaller
+            if len(encoded) >= len(CURSOR_HOME) + h * w * glyph_len:
+                full_frame = encode_full_frame(grid)
+                if len(full_frame) > len(encoded):
+                    full_frame = None
+                elif stats is not None:
+                    stats["damage_scene_cuts"] += 1
+
+        if stale or full_frame is not None:
+            if full_frame is None:
+                full_frame = encode_full_frame(grid)
+            encoded = full_frame
+            self.frames_since_refresh = 0
+            self.keyframe = True
+            if stats is not None:
+                stats["damage_full_frames"] += 1
+        else:
+            encoded = encoded.tobytes()
+            self.frames_since_refresh += 1
+            self.keyframe = False
+
+        # Remember what the terminal now shows
+        if stale:
+            self.glyphs = glyphs.copy()
+            self.keys = [layer_keys.copy() for layer_keys in keys]
+        else:
+            np.copyto(self.glyphs, glyphs)
+            for layer_keys, previous in zip(keys, self.keys):
+                np.copyto(previous, layer_keys)
+        return encoded
+
+
+class RowTracker:
+    """
+    Row-level dedupe, a cheaper tier than cell-level damage tracking.
+
+    Only one checksum per terminal row is kept between frames. Rows whose checksum
+    matches the previous frame are skipped and the cursor jumps straight to the
+    next dirty row, which pays off for letterboxed content and still frames.
+    """
+
+    def __init__(self, refresh_interval=300):
+        """
+        Args:
+            refresh_interval (int): Force a full redraw every N frames (0 disables).
+        """
+        self.refresh_interval = refresh_interval
+        self.hashes = None
+        self.frames_since_refresh = 0
+        self.keyframe = False # Whether the last encoded frame was drawn in full
+        self._weights = {}
+
+    def reset(self):
+        """Forgets the displayed rows so the next frame is drawn in full."""
+        self.hashes = None
+
+    def _row_weights(self, n):
+        """Fixed pseudo-random odd 64-bit multipliers, one per byte column of a row."""
+        weights = self._weights.get(n)
+        if weights is None:
+            rng = np.random.default_rng(0x5EED)
+            weights = rng.integers(1, 2 ** 63, size=n, dtype=np.uint64) | np.uint64(1)
+            self._weights[n] = weights
+        return weights
+
+    def row_hashes(self, grid):
+        """Vectorized per-row checksum over the glyph bytes and color keys of a grid."""
+        h = grid.glyphs.shape[0]
+        columns = [grid.glyphs.reshape(h, -1)] + [layer.keys for layer in grid.layers]
+        weights = self._row_weights(sum(c.shape[1] for c in columns))
+        
+        # Consecutive weight ranges so glyph and color columns never share a multiplier
+        hashes = np.zeros(h, dtype=np.uint64)
+        pos = 0
+        for column in columns:
+            hashes ^= column.astype(np.uint64) @ weights[pos:pos + column.shape[1]]
+            pos += column.shape[1]
+        return hashes
+
+    def encode(self, grid, stats=None):
+        """
+        Encodes a frame, rewriting only the rows that changed since the previous one.
+
+        Args:
+            grid (CellGrid): Glyphs and color layers of the new frame.
+            stats (Counter, optional): Receives skipped-row and refresh counters.
+
+        Returns:
+            bytes: Terminal output for this frame (empty if nothing changed).
+        """
+        h, w, _ = grid.glyphs.shape
+        hashes = self.row_hashes(grid)
+        previous, self.hashes = self.hashes, hashes
+        
+        # Scene cuts: with every row dirty, the row jumps make the delta dearer than a full frame
+        dirty = None if previous is None or previous.shape != hashes.shape else hashes != previous
+        if (dirty is None or dirty.all()
+                or (self.refresh_interval and self.frames_since_refresh + 1 >= self.refresh_interval)):
+            self.frames_since_refresh = 0
+            self.keyframe = True
+            if stats is not None:
+                stats["damage_full_frames"] += 1
+                stats["damage_scene_cuts"] += dirty is not None and bool(dirty.all())
+            return encode_full_frame(grid)
+        
+        # Rewrite dirty rows in full; each one starts with a jump to its first column
+        self.frames_since_refresh += 1
+        self.keyframe = False
+        if stats is not None:
+            stats["rows_skipped"] += h - int(dirty.sum())
+            stats["rows"] += h
+        if not dirty.any():
+            return b""
+        emit = np.broadcast_to(dirty[:, None], (h, w))
+        return encode_cells(grid, emit=emit).tobytes()
+
+
+class StripePool:
+    """
+    Thread pool for row-striped work on very wide frames.
+
+    A frame is split into contiguous bands of rows and each band is processed on
+    its own thread. The bands write disjoint slices of the same output arrays, so
+    nothing is concatenated afterwards; NumPy releases the GIL in the copy and
+    take loops that do the work.
+    """
+
+    def __init__(self, threads=None, min_rows=8):
+        """
+        Args:
+            threads (int, optional): Number of threads, including the caller (default: CPU count).
+            min_rows (int): Smallest band worth handing to another thread.
+        """
+        self.threads = max(threads or os.cpu_count() or 1, 1)
+        self.min_rows = min_rows
+        self._executor = None
+        if self.threads > 1:
+            self._executor = ThreadPoolExecutor(self.threads - 1, thread_name_prefix="pixelstream-stripe")
+
+    def bands(self, rows):
+        """Splits `rows` into at most `threads` contiguous (start, stop) bands."""
+        count = max(min(self.threads, rows // self.min_rows), 1)
+        edges = [rows * i // count for i in range(count + 1)]
+        return list(zip(edges[:-1], edges[1:]))
+
+    def run(self, fn, rows):
+        """Calls fn(start, stop) for every band; the calling thread takes the first one."""
+        bands = self.bands(rows)
+        if self._executor is None or len(bands) == 1:
+            fn(0, rows)
+            return
+        futures = [self._executor.submit(fn, start, stop) for start, stop in bands[1:]]
+        fn(*bands[0])
+        for future in futures:
+            future.result()
+
+    def close(self):
+        """Shuts the worker threads down."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+class RenderContext:
+    """
+    Per-stream rendering state.
+
+    The output geometry is fixed when the stream opens. Resize destinations,
+    intermediate arrays, dither tiles and output buffers are allocated on first
+    use and then reused for every frame, so a steady-state frame allocates no
+    frame-sized scratch memory. Every allocation is counted in `stats` to make
+    regressions visible.
+    """
+
+    def __init__(self, source_width, source_height, width, stats=None, stripes=None,
+                 palette=None, interpolation=None):
+        """
+        Args:
+            source_width (int): Width of the decoded video frames in pixels.
+            source_height (int): Height of the decoded video frames in pixels.
+            width (int): Output width in terminal cells.
+            stats (Counter, optional): Receives scratch allocation counters.
+            stripes (StripePool, optional): Runs row-banded work in parallel.
+            palette (SgrPalette, optional): Color depth of the output; None renders mono.
+            interpolation (int, optional): cv2 resize interpolation; by default INTER_AREA
+                for large downscales and INTER_LINEAR otherwise.
+        """
+        self.source_width = source_width
+        self.source_height = source_height
+        self.width = width
+        self.palette = palette
+        self.interpolation = interpolation
+        
+        # Apply font aspect ratio correction (0.55)
+        aspect_ratio = source_height / source_width
+        self.height = max(int(aspect_ratio * width * 0.55), 1)
+        
+        self.stats = stats if stats is not None else Counter()
+        self.stripes = stripes
+        self.frames = 0
+        self._arrays = {}
+
+    @property
+    def tier(self):
+        """Output settings of this context: (width, palette, interpolation)."""
+        return (self.width, self.palette, self.interpolation)
+
+    def matches(self, frame, tier):
+        """True if this context was set up for frames of this size with these output settings."""
+        return frame.shape[:2] == (self.source_height, self.source_width) and tier == self.tier
+
+    def begin_frame(self):
+        """Marks the start of a frame; allocations after the first frame count as steady-state."""
+        self.frames += 1
+
+    def striped(self, fn, rows):
+        """Calls fn(start, stop) over bands of `rows`, in parallel when a stripe pool is set."""
+        if self.stripes is None:
+            fn(0, rows)
+        else:
+            self.stripes.run(fn, rows)
+
+    def array(self, name, shape, dtype=np.uint8):
+        """Returns the named scratch array, allocating it only on first use or a shape change."""
+        arr = self._arrays.get(name)
+        if arr is None or arr.shape != shape or arr.dtype != dtype:
+            arr = np.empty(shape, dtype=dtype)
+            self._arrays[name] = arr
+            self.stats["scratch_allocations"] += 1
+            if self.frames > 1:
+                self.stats["scratch_allocations_steady"] += 1
+        return arr
+
+    def resize(self, frame, rows_per_cell=1, cols_per_cell=1):
+        """
+        Resizes a video frame into the preallocated output grid.
+
+        Sub-cell renderers ask for several pixels per cell in each direction.
+        Large downscales use INTER_AREA, which averages every source pixel instead
+        of sampling a few of them, so fine detail doesn't alias.
+        """
+        out_w, out_h = self.width * cols_per_cell, self.height * rows_per_cell
+        dst = self.array(f"resized_{rows_per_cell}x{cols_per_cell}", (out_h, out_w, 3))
+        interpolation = self.interpolation
+        if interpolation is None:
+            downscale = self.source_width >= 2 * out_w and self.source_height >= 2 * out_h
+            interpolation = cv2.INTER_AREA if downscale else cv2.INTER_LINEAR
+        return cv2.resize(frame, (out_w, out_h), dst=dst, interpolation=interpolation)
+
+    def frame_buffer(self, height, width, cell, row_end):
+        """
+        Returns a reusable uint8 output buffer with a fixed-width cell layout.
+
+        Every row is laid out as `width` copies of the `cell` template followed
+        by `row_end`, so renderers only overwrite the variable bytes.
+
+        Args:
+            height (int): Number of terminal rows.
+            width (int): Number of cells per row.
+            cell (bytes): Template for a single cell.
+            row_end (bytes): Bytes terminating every row (reset, line feed).
+
+        Returns:
+            tuple: (buffer of shape (H, W*len(cell)+len(row_end)), cell view of shape (H, W, len(cell)))
+        """
+        row_len = width * len(cell) + len(row_end)
+        key = ("frame", cell, row_end)
+        buf = self._arrays.get(key)
+        if buf is None or buf.shape != (height, row_len):
+            buf = self.array(key, (height, row_len))
+            buf[:, :width * len(cell)] = np.tile(np.frombuffer(cell, dtype=np.uint8), width)
+            buf[:, width * len(cell):] = np.frombuffer(row_end, dtype=np.uint8)
+        return buf, buf[:, :width * len(cell)].reshape(height, width, len(cell))
+
+    def dither_tile(self, matrix, height, width, scale, offset=0, dtype=np.int16):
+        """
+        Threshold matrix tiled over an output geometry as floor(t * scale + offset).
+
+        Tiles are cached per geometry and scale, so dithering costs a single add
+        (or compare) per frame.
+        """
+        key = ("dither", height, width, scale, offset)
+        tile = self._arrays.get(key)
+        if tile is None:
+            reps = (-(-height // matrix.shape[0]), -(-width // matrix.shape[1]))
+            tile = self.array(key, (height, width), dtype)
+            tile[:] = np.floor(np.tile(matrix, reps)[:height, :width] * scale + offset)
+        return tile
+
+
+class FrameReader:
+    """
+    Decode-ahead reader for a cv2.VideoCapture.
+
+    A background thread decodes frames into a fixed pool of preallocated images
+    and hands them over through a bounded queue, so decode latency spikes
+    (keyframes, high-bitrate scenes) overlap with rendering and terminal writes
+    instead of stalling the display. OpenCV releases the GIL while decoding.
+
+    Frames returned by `read()` stay valid until the next call, which recycles
+    them into the pool. Consumers that keep several frames in flight use `take()`
+    and hand each frame back with `release()` instead. With a depth of 0 frames
+    are read synchronously.
+
+    Frames the `skip` callback rejects are only grabbed, never retrieved, which
+    saves the BGR conversion and copy of a full read. The `until` callback ends
+    the stream early, before the first frame it accepts.
+    """
+
+    def __init__(self, cap, depth=4, stats=None, images=None, skip=None, start=0, until=None):
+        """
+        Args:
+            cap (cv2.VideoCapture): Opened capture; owned by the reader thread until `close()`.
+            depth (int): Maximum number of decoded frames waiting to be rendered.
+            stats (Counter, optional): Receives queue occupancy, stall and decode cost counters.
+            images (list, optional): Preallocated images to decode into (e.g. shared memory
+                slots); by default depth + 2 images sized from the capture are allocated.
+            skip (callable, optional): skip(position, queued) -> bool, called with the frame
+                number and the count of frames waiting ahead of it; True grabs the frame only.
+            start (int): Frame number of the capture's next frame, if it was seeked.
+            until (callable, optional): until(position) -> bool; True ends the stream before
+                that frame, which is left ungrabbed and its number in `stopped_at`.
+        """
+        self.cap = cap
+        self.depth = depth
+        self.stats = stats if stats is not None else Counter()
+        self.skip = skip
+        self.until = until
+        self.stopped_at = None
+        self.position = start - 1
+        self._grabbed = start - 1
+        self._current = None
+        self._error = None
+        self._stop = threading.Event()
+        self._thread = None
+        if depth <= 0:
+            return
+        
+        # One image per queue slot, plus the one being decoded and the one being rendered
+        if images is None:
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            images = [np.empty((height, width, 3), dtype=np.uint8) if width and height else None
+                      for _ in range(depth + 2)]
+        self._free = queue.Queue()
+        for image in images:
+            self._free.put(image)
+        self._ready = queue.Queue(maxsize=depth)
+        self._thread = threading.Thread(target=self._run, name="pixelstream-decode", daemon=True)
+        self._thread.start()
+
+    def _decode(self, image=None):
+        """
+        Grabs frames until one is wanted and retrieves it into `image`.
+
+        Returns:
+            tuple: (frame number, frame), or None at the end of the stream.
+        """
+        while True:
+            if self.until is not None and self.until(self._grabbed + 1):
+                self.stopped_at = self._grabbed + 1
+                return None
+            start = time.perf_counter()
+            if not self.cap.grab():
+                return None
+            grabbed = time.perf_counter()
+            self._grabbed += 1
+            self.stats["decode_grabs"] += 1
+            self.stats["decode_grab_time"] += grabbed - start
+            
+            queued = self._ready.qsize() if self.depth > 0 else 0
+            if self.skip is not None and self.skip(self._grabbed, queued):
+                self.stats["decode_skipped"] += 1
+                continue
+            
+            ret, image = self.cap.retrieve(image) if image is not None else self.cap.retrieve()
+            self.stats["decode_retrieves"] += 1
+            self.stats["decode_retrieve_time"] += time.perf_counter() - grabbed
+            return (self._grabbed, image) if ret else None
+
+    def _run(self):
+        """Decoder thread: fills free images and queues them until EOF or `close()`."""
+        try:
+            while not self._stop.is_set():
+                image = self._free.get()
+                if self._stop.is_set():
+                    break
+                decoded = self._decode(image)
+                if decoded is None:
+                    break
+                if self._ready.full():
+                    self.stats["prefetch_full"] += 1
+                self._ready.put(decoded)
+        except Exception as e:
+            self._error = e
+        finally:
+            self._ready.put(None)
+
+    def read(self):
+        """
+        Returns the next decoded frame, or None at the end of the stream.
+
+        The previously returned frame is recycled and must no longer be used.
+        """
+        if self._current is not None:
+            self.release(self._current)
+        self._current = self.take()
+        return self._current
+
+    @property
+    def available(self):
+        """Number of decoded frames waiting to be taken."""
+        return self._ready.qsize() if self._thread is not None else 0
+
+    def take(self):
+        """
+        Returns the next decoded frame (None at the end); the caller must `release()` it.
+
+        Its frame number in the stream is left in `position`.
+        """
+        if self._thread is None:
+            decoded = self._decode()
+            if decoded is None:
+                return None
+            self.position, frame = decoded
+            return frame
+        
+        # Occupancy is sampled when the renderer asks for a frame; an empty queue is a stall
+        self.stats["prefetch_reads"] += 1
+        self.stats["prefetch_occupancy"] += self._ready.qsize()
+        if self._ready.empty():
+            self.stats["prefetch_stalls"] += 1
+            start = time.perf_counter()
+            decoded = self._ready.get()
+            self.stats["prefetch_stall_time"] += time.perf_counter() - start
+        else:
+            decoded = self._ready.get()
+        
+        if decoded is None:
+            # Leave the end-of-stream marker in place for any further reads
+            self._ready.put(None)
+            if self._error is not None:
+                raise self._error
+            return None
+        self.position, frame = decoded
+        return frame
+
+    def release(self, frame):
+        """Returns a frame obtained from `take()` to the decode pool."""
+        if self._thread is not None:
+            self._free.put(frame)
+
+    @property
+    def frame_count(self):
+        """Frames grabbed so far, skipped ones included; the stream's length once it hit EOF."""
+        return self._grabbed + 1
+
+    def close(self):
+        """Stops the decoder thread. The capture can be released afterwards."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        
+        # Unblock the decoder whichever queue it is waiting on
+        self._free.put(None)
+        while self._thread.is_alive():
+            try:
+                self._ready.get(timeout=0.05)
+            except queue.Empty:
+                pass
+        self._thread = None
+        
+        # Wake any consumer still waiting for a frame, and let go of the image pool
+        self._ready.put(None)
+        self._free = queue.Queue()
+        self._current = None
+
+
+class FrameCodec:
+    """
+    zlib compression of encoded frames against a preset dictionary.
+
+    Frames are compressed one at a time so any of them can be decompressed on
+    its own, but a fresh zlib stream knows nothing of the escape sequences and
+    glyph runs every frame of a clip repeats. `train()` builds a dictionary from
+    sample frames that primes each stream with them; it's stored once, next to
+    the frames compressed against it.
+    """
+
+    SIZE = 32768 # zlib's window; a longer dictionary would only be partly visible
+    SAMPLE_FRAMES = 32
+    SAMPLE_BYTES = 8 * SIZE
+    BLOCK = 64
+
+    def __init__(self, dictionary=None, level=1, stats=None):
+        """
+        Args:
+            dictionary (bytes, optional): Preset dictionary; None compresses frames on their own.
+            level (int): zlib compression level. Decompression cost does not depend on it.
+            stats (Counter, optional): Receives compression and decompression counters.
+        """
+        self.dictionary = dictionary or None
+        self.stats = stats if stats is not None else Counter()
+        
+        # Primed streams are copied for every frame instead of loading the dictionary each time
+        primed = {"zdict": dictionary} if dictionary else {}
+        self._compressor = zlib.compressobj(level, **primed)
+        self._decompressor = zlib.decompressobj(**primed)
+
+    @classmethod
+    def train(cls, samples, size=SIZE):
+        """
+        Builds a preset dictionary from sample frames.
+
+        Blocks already taken from a later sample are left out so the space goes to
+        distinct content. Later samples end up last, where zlib reaches them with
+        the shortest match distances.
+
+        Args:
+            samples (list[bytes]): Encoded frames in playback order.
+            size (int): Maximum dictionary size in bytes.
+
+        Returns:
+            bytes: The dictionary.
+        """
+        seen = set()
+        blocks = []
+        total = 0
+        for sample in reversed(samples):
+            for end in range(len(sample), 0, -cls.BLOCK):
+                block = bytes(sample[max(end - cls.BLOCK, 0):end])
+                if block in seen:
+                    continue
+                seen.add(block)
+                blocks.append(block)
+                total += len(block)
+                if total >= size:
+                    return b"".join(reversed(blocks))[-size:]
+        return b"".join(reversed(blocks))
+
+    def compress(self, data):
+        """Compresses one frame."""
+        compressor = self._compressor.copy()
+        compressed = compressor.compress(data) + compressor.flush()
+        self.stats["compress_in"] += len(data)
+        self.stats["compress_out"] += len(compressed)
+        return compressed
+
+    def decompress(self, data):
+        """Decompresses one frame."""
+        start = time.perf_counter()
+        decompressor = self._decompressor.copy()
+        output = decompressor.decompress(data) + decompressor.flush()
+        self.stats["decompress_frames"] += 1
+        self.stats["decompress_time"] += time.perf_counter() - start
+        return output
+
+
+class LoopCache:
+    """
+    Encoded frames of a looping clip, kept in memory so later passes are pure writes.
+
+    Frames are stored by their number in the source as the terminal received
+    them, optionally zlib-compressed against a dictionary trained on the first
+    frames stored (clips shorter than that sample stay uncompressed). Entries
+    are only valid for the quality tier they were rendered at; storing a frame
+    from another tier starts over. Once the memory limit is reached no more
+    frames are added, so a clip that doesn't fit keeps its opening frames cached
+    and the rest is decoded again.
+    """
+
+    def __init__(self, limit, compress=False, stats=None):
+        """
+        Args:
+            limit (int): Maximum resident size in bytes.
+            compress (bool): Store frames zlib-compressed.
+            stats (Counter, optional): Receives hit, miss and size counters.
+        """
+        self.limit = limit
+        self.compress = compress
+        self.stats = stats if stats is not None else Counter()
+        self.tier = None
+        self.frames = {}
+        self.resident = 0
+        self.size = 0
+        self.full = False
+        self.length = None # Frames in the clip, known after a pass decoded it to the end
+        self.codec = None # Trained once enough frames are stored; until then frames are kept as is
+
+    def __contains__(self, position):
+        return position in self.frames
+
+    def chain(self, position, shown=None):
+        """Frames to write to show frame `position`; cached frames are complete, so just that one."""
+        return range(position, position + 1)
+
+    def get(self, position):
+        """Returns the encoded frame at `position` (which must be cached)."""
+        self.stats["cache_hits"] += 1
+        data = self.frames[position]
+        return data if self.codec is None else self.codec.decompress(data)
+
+    def store(self, position, output, tier):
+        """
+        Adds a frame that was just written; frames that don't fit are left out.
+
+        Args:
+            position (int): Frame number in the source.
+            output (bytes): Encoded frame as written to the terminal.
+            tier (tuple): Quality tier the frame was rendered at.
+        """
+        self.stats["cache_misses"] += 1
+        if tier != self.tier:
+            self.clear()
+            self.tier = tier
+        if self.full or position in self.frames:
+            return
+        if self.compress and self.codec is None and self.frames and (
+                len(self.frames) >= FrameCodec.SAMPLE_FRAMES
+                or self.resident + len(output) > min(FrameCodec.SAMPLE_BYTES, self.limit)):
+            self._train()
+        data = output if self.codec is None else self.codec.compress(output)
+        if self.resident + len(data) > self.limit:
+            self.full = True
+            return
+        self.frames[position] = data
+        self.resident += len(data)
+        self.size += len(output)
+
+    def _train(self):
+        """Trains the dictionary on the frames stored so far and compresses them with it."""
+        self.codec = FrameCodec(FrameCodec.train(list(self.frames.values())), stats=self.stats)
+        for position, output in self.frames.items():
+            self.frames[position] = self.codec.compress(output)
+        self.resident = sum(map(len, self.frames.values()))
+
+    def clear(self):
+        """Drops every cached frame."""
+        self.frames.clear()
+        self.resident = self.size = 0
+        self.full = False
+        self.codec = None
+
+
+# .pxs container: header, [compression dictionary,] encoded frames back to back, then the frame index
+PXS_MAGIC = b"PXS1"
+PXS_VERSION = 3 # 2: per-frame flags, so frames can be deltas against the previous one
+                # 3: compressed frames use a preset dictionary stored after the header
+PXS_HEADER = struct.Struct("<4sHHIIdQQ16s16s") # magic, version, flags, columns, rows, fps,
+                                               # frame count, index offset, mode, palette
+PXS_DICTIONARY = struct.Struct("<I") # dictionary size, followed by the dictionary
+PXS_COMPRESSED = 1
+PXS_KEYFRAME = 1
+PXS_INDEX = np.dtype([("offset", "<u8"), ("size", "<u4"), ("time_us", "<u8"), ("flags", "u1")])
+PXS_INDEX_V1 = np.dtype([("offset", "<u8"), ("size", "<u4"), ("time_us", "<u8")])
+
+
+class PxsWriter:
+    """
+    Writes pre-rendered frames into a .pxs container.
+
+    The header is written first with placeholders and completed by `finish()`
+    once the frame count and the position of the index are known, so frames can
+    be streamed to the file as they are rendered. Frames are either keyframes,
+    drawn in full, or deltas that only update what changed since the frame
+    before them. With compression the first frames are held back until the
+    dictionary is trained on them, since it has to precede them in the file.
+    """
+
+    def __init__(self, file, columns, rows, fps, mode, palette=None, compress=False, level=1, stats=None):
+        """
+        Args:
+            file (file): Binary file opened for writing; stays owned by the caller.
+            columns (int): Output width in cells.
+            rows (int): Output height in cells.
+            fps (float): Frame rate of the clip.
+            mode (str): Cell renderer the frames were made with.
+            palette (str, optional): Color palette name, None for monochrome.
+            compress (bool): zlib-compress each frame against a trained dictionary.
+            level (int): zlib compression level.
+            stats (Counter, optional): Receives compression counters.
+        """
+        self.file = file
+        self.columns = columns
+        self.rows = rows
+        self.fps = fps
+        self.mode = mode
+        self.palette = palette
+        self.compress = compress
+        self.level = level
+        self.stats = stats
+        self.codec = None
+        self.index = []
+        self._pending = [] # (output, keyframe) held back until the dictionary is trained
+        self._pending_size = 0
+        self.offset = PXS_HEADER.size
+        file.write(bytes(PXS_HEADER.size))
+
+    @property
+    def frames(self):
+        """Number of frames added so far."""
+        return len(self.index) + len(self._pending)
+
+    def add(self, output, keyframe=True):
+        """Appends the next frame; `keyframe` is False for deltas against the previous frame."""
+        if self.compress and self.codec is None:
+            self._pending.append((output, keyframe))
+            self._pending_size += len(output)
+            if len(self._pending) >= FrameCodec.SAMPLE_FRAMES or self._pending_size >= FrameCodec.SAMPLE_BYTES:
+                self._train()
+            return
+        self._write(output, keyframe)
+
+    def _write(self, output, keyframe):
+        """Writes one frame and indexes it."""
+        data = self.codec.compress(output) if self.codec else output
+        self.file.write(data)
+        self.index.append((self.offset, len(data), round(len(self.index) * 1e6 / self.fps),
+                           PXS_KEYFRAME if keyframe else 0))
+        self.offset += len(data)
+
+    def _train(self, short=False):
+        """
+        Trains the dictionary on the held back frames, stores it and writes them.
+
+        A `short` clip ended before filling the training sample; its dictionary would
+        hold most of the clip a second time, so its frames are compressed without one.
+        """
+        dictionary = b"" if short else FrameCodec.train([output for output, _ in self._pending])
+        self.codec = FrameCodec(dictionary, level=self.level, stats=self.stats)
+        self.file.write(PXS_DICTIONARY.pack(len(dictionary)) + dictionary)
+        self.offset += PXS_DICTIONARY.size + len(dictionary)
+        for output, keyframe in self._pending:
+            self._write(output, keyframe)
+        self._pending = []
+
+    def finish(self):
+        """Writes the index and completes the header."""
+        if self.compress and self.codec is None:
+            self._train(short=True)
+        self.file.write(np.array(self.index, dtype=PXS_INDEX).tobytes())
+        self.file.seek(0)
+        self.file.write(PXS_HEADER.pack(PXS_MAGIC, PXS_VERSION, PXS_COMPRESSED if self.compress else 0,
+                                        self.columns, self.rows, self.fps, len(self.index), self.offset,
+                                        self.mode.encode(), (self.palette or "").encode()))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+
+class PxsReader:
+    """
+    Memory-mapped .pxs container for playback.
+
+    Frames are returned as slices of the mapping, so uncompressed frames reach
+    the terminal without being copied. Seeking is a binary search over the
+    index timestamps; showing a delta frame out of sequence replays it from the
+    closest keyframe before it.
+    """
+
+    def __init__(self, path, stats=None):
+        """
+        Args:
+            path (str): Container file.
+            stats (Counter, optional): Receives decompression counters.
+
+        Raises:
+            ValueError: If the file is not a complete container.
+        """
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.size = len(self._map)
+        
+        # Unmap a rejected file right away, so the caller can delete it (even on Windows)
+        valid = self.size >= PXS_HEADER.size
+        if valid:
+            (magic, version, flags, self.columns, self.rows, self.fps, self.length, index_offset,
+             mode, palette) = PXS_HEADER.unpack_from(self._map)
+            dtype = PXS_INDEX_V1 if version == 1 else PXS_INDEX
+            valid = (magic == PXS_MAGIC and 1 <= version <= PXS_VERSION and self.length > 0
+                     and index_offset + self.length * dtype.itemsize == self.size)
+        if not valid:
+            self._map.close()
+            raise ValueError(f"Not a complete .pxs container: {path}")
+        self.compressed = bool(flags & PXS_COMPRESSED)
+        self.codec = None
+        if self.compressed:
+            dictionary = None
+            if version >= 3:
+                size, = PXS_DICTIONARY.unpack_from(self._map, PXS_HEADER.size)
+                start = PXS_HEADER.size + PXS_DICTIONARY.size
+                dictionary = self._map[start:start + size]
+            self.codec = FrameCodec(dictionary, stats=stats)
+        self.mode = mode.rstrip(b"\0").decode()
+        self.palette = palette.rstrip(b"\0").decode() or None
+        self.index = np.frombuffer(self._map, dtype=dtype, count=self.length, offset=index_offset)
+        if version == 1:
+            self.keyframes = np.arange(self.length)
+        else:
+            self.keyframes = np.flatnonzero(self.index["flags"] & PXS_KEYFRAME)
+        self._view = memoryview(self._map)
+
+    @staticmethod
+    def is_container(path):
+        """True if `path` starts with the .pxs magic."""
+        try:
+            with open(path, "rb") as f:
+                return f.read(len(PXS_MAGIC)) == PXS_MAGIC
+        except OSError:
+            return False
+
+    def __contains__(self, position):
+        return 0 <= position < self.length
+
+    def chain(self, position, shown=None):
+        """
+        Frames to write, in order, to bring the terminal to frame `position`.
+
+        Args:
+            position (int): Frame to show.
+            shown (int, optional): Frame the terminal currently shows, if it belongs to this run.
+
+        Returns:
+            range: Frame numbers, starting at the closest keyframe unless the deltas
+                since `shown` lead there directly.
+        """
+        keyframe = int(self.keyframes[np.searchsorted(self.keyframes, position, side="right") - 1])
+        if shown is not None and keyframe <= shown < position:
+            return range(shown + 1, position + 1)
+        return range(keyframe, position + 1)
+
+    def get(self, position):
+        """Returns the encoded frame at `position`, as a view into the file if uncompressed."""
+        offset, size = int(self.index["offset"][position]), int(self.index["size"][position])
+        data = self._view[offset:offset + size]
+        return self.codec.decompress(data) if self.codec else data
+
+    def seek(self, seconds):
+        """Returns the number of the first frame at or after `seconds`."""
+        return int(np.searchsorted(self.index["time_us"], round(seconds * 1e6)))
+
+    def close(self):
+        """Unmaps the file; frame views handed out must be gone by now."""
+        self.index = None
+        self._view.release()
+        try:
+            self._map.close()
+        except BufferError:
+            pass # A frame view is still referenced; the mapping goes with it
+
+
+class RenderCache:
+    """
+    On-disk cache of fully encoded clips, shared by every player using the same directory.
+
+    An entry is a .pxs container holding every frame of one clip rendered with
+    one set of output parameters. Its key hashes the input's size, modification time and first
+    and last megabyte together with those parameters, so a hit can be streamed
+    without opening the video at all. Entries are written to a temporary file
+    and renamed into place, so concurrent players never see a partial entry and
+    racing writers simply replace each other's identical result. Playing an
+    entry refreshes its modification time; eviction removes the least recently
+    used entries once the directory outgrows its limit.
+    """
+
+    SUFFIX = ".pxs"
+    
+    # Bytes of content hashed at each end of the input file
+    SAMPLE = 1 << 20
+
+    def __init__(self, directory, limit, stats=None):
+        """
+        Args:
+            directory (str): Cache directory; created if missing.
+            limit (int): Maximum total size of the entries in bytes.
+            stats (Counter, optional): Receives hit, miss, store and eviction counters.
+        """
+        self.directory = directory
+        self.limit = limit
+        self.stats = stats if stats is not None else Counter()
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, video_path, params):
+        """
+        Derives the entry key for a video and the parameters that shape its output.
+
+        Args:
+            video_path (str): Input file.
+            params (dict): Output parameters (JSON-serializable).
+        """
+        info = os.stat(video_path)
+        digest = hashlib.sha256()
+        digest.update(json.dumps({"size": info.st_size, "mtime": info.st_mtime_ns, "params": params},
+                                 sort_keys=True).encode())
+        with open(video_path, "rb") as f:
+            digest.update(f.read(self.SAMPLE))
+            if info.st_size > 2 * self.SAMPLE:
+                f.seek(-self.SAMPLE, os.SEEK_END)
+                digest.update(f.read(self.SAMPLE))
+        return digest.hexdigest()
+
+    def path(self, key):
+        """File that holds the entry for `key`."""
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def open(self, key):
+        """
+        Returns the PxsReader for the entry stored under `key`, or None on a miss.
+        """
+        path = self.path(key)
+        try:
+            entry = PxsReader(path, stats=self.stats)
+        except FileNotFoundError:
+            self.stats["disk_cache_misses"] += 1
+            return None
+        except (OSError, ValueError):
+            # Damaged entry (e.g. a full disk); drop it and record a fresh one
+            self.stats["disk_cache_misses"] += 1
+            self._remove(path)
+            return None
+        try:
+            os.utime(path) # Most recently used
+        except OSError:
+            pass
+        self.stats["disk_cache_hits"] += 1
+        return entry
+
+    def recorder(self, key, **container):
+        """Starts recording a new entry for `key`; `container` holds the PxsWriter settings."""
+        return RenderRecorder(self, key, **container)
+
+    def commit(self, temp_path, key):
+        """Moves a finished recording into place and evicts old entries."""
+        try:
+            os.replace(temp_path, self.path(key))
+        except PermissionError:
+            # Windows won't replace a file another player has mapped; that entry is just as good
+            self._remove(temp_path)
+            return
+        self.stats["disk_cache_stored"] += 1
+        self.evict()
+
+    def evict(self):
+        """Removes least recently used entries until the directory fits its limit."""
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                info = os.stat(path)
+            except FileNotFoundError:
+                continue # Evicted by another player meanwhile
+            if name.endswith(self.SUFFIX):
+                entries.append((info.st_mtime, info.st_size, path))
+            elif name.endswith(".tmp") and time.time() - info.st_mtime > 3600:
+                self._remove(path) # Left behind by a player that died mid-recording
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.limit:
+                break
+            if self._remove(path):
+                total -= size
+                self.stats["disk_cache_evicted"] += 1
+
+    @staticmethod
+    def _remove(path):
+        """Deletes a file; returns False if it is in use (mapped by a player on Windows)."""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except PermissionError:
+            return False
+        return True
+
+
+class RenderRecorder:
+    """
+    Records one playback pass into a new render cache entry.
+
+    Frames have to arrive complete and in order from the first frame of the
+    clip; anything else (a dropped or skipped frame, a different quality tier)
+    abandons the recording, since the entry must hold the whole clip.
+    """
+
+    def __init__(self, cache, key, **container):
+        """
+        Args:
+            cache (RenderCache): Cache the entry is committed to.
+            key (str): Entry key.
+            **container: PxsWriter settings (geometry, fps, mode, palette, compress).
+        """
+        self.cache = cache
+        self.key = key
+        fd, self.temp_path = tempfile.mkstemp(prefix=key[:16] + ".", suffix=".tmp", dir=cache.directory)
+        if hasattr(os, "fchmod"): # Not on Windows before Python 3.13
+            os.fchmod(fd, 0o644) # Readable by players running as other users
+        self._file = os.fdopen(fd, "wb")
+        self.writer = PxsWriter(self._file, stats=cache.stats, **container)
+
+    @property
+    def active(self):
+        """False once the recording was abandoned or finished."""
+        return self._file is not None
+
+    def add(self, position, output):
+        """Appends the frame at `position`, or abandons the recording if it's out of sequence."""
+        if not self.active:
+            return
+        if position != self.writer.frames:
+            self.abandon()
+            return
+        self.writer.add(output)
+
+    def finish(self, frame_count):
+        """
+        Commits the entry if it holds all `frame_count` frames of the clip, else abandons it.
+        """
+        if not self.active:
+            return
+        if frame_count != self.writer.frames or not frame_count:
+            self.abandon()
+            return
+        self.writer.finish()
+        self._file.close()
+        self._file = None
+        self.cache.commit(self.temp_path, self.key)
+
+    def abandon(self):
+        """Discards the partial recording."""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        RenderCache._remove(self.temp_path)
+
+
+class PipelineStopped(Exception):
+    """Raised inside pipeline threads once the pipeline is shutting down."""
+
+
+class Pipeline:
+    """
+    Small staged runtime: a source thread, stages with worker pools, and an ordered sink.
+
+    The source numbers its items and every stage hands its results to the next
+    through a bounded queue, so a slow stage applies backpressure instead of
+    buffering without limit. Stages with several workers may finish items out of
+    order; ordered stages and the sink hold early items back and process them by
+    sequence number. The sink runs on the thread that calls `run()`.
+    """
+
+    _END = object()
+
+    def __init__(self, depth=2, stats=None):
+        """
+        Args:
+            depth (int): Queue slots per worker between stages.
+            stats (Counter, optional): Receives per-stage busy time and item counters.
+        """
+        self.depth = depth
+        self.stats = stats if stats is not None else Counter()
+        self.stages = []
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._error = None
+
+    def stage(self, name, fn, workers=1, ordered=False):
+        """
+        Appends a stage that maps every item through `fn`.
+
+        Args:
+            name (str): Stage name used in the statistics.
+            fn (callable): Called with one item, returns the item passed downstream.
+            workers (int): Number of threads running `fn` concurrently.
+            ordered (bool): Process items strictly in sequence order (implies one worker).
+
+        Returns:
+            Pipeline: self, for chaining.
+        """
+        self.stages.append((name, fn, 1 if ordered else max(workers, 1), ordered))
+        return self
+
+    def get(self, q):
+        """Blocking queue get that gives up with PipelineStopped when the pipeline stops."""
+        while True:
+            if self._stop.is_set():
+                raise PipelineStopped
+            try:
+                return q.get(timeout=0.05)
+            except queue.Empty:
+                pass
+
+    def put(self, q, item):
+        """Blocking queue put that gives up with PipelineStopped when the pipeline stops."""
+        while True:
+            if self._stop.is_set():
+                raise PipelineStopped
+            try:
+                return q.put(item, timeout=0.05)
+            except queue.Full:
+                pass
+
+    def _items(self, inbox, ordered):
+        """Yields (seq, item) pairs from a queue until the end marker, reordered if asked."""
+        pending = {}
+        next_seq = 0
+        while True:
+            entry = self.get(inbox)
+            if entry is self._END:
+                return
+            if not ordered:
+                yield entry
+                continue
+            seq, item = entry
+            if seq != next_seq:
+                with self._lock:
+                    self.stats["pipeline_reordered"] += 1
+            pending[seq] = item
+            while next_seq in pending:
+                yield next_seq, pending.pop(next_seq)
+                next_seq += 1
+
+    def _fail(self, error):
+        """Records the first error raised by any thread and stops the pipeline."""
+        with self._lock:
+            if self._error is None:
+                self._error = error
+        self._stop.set()
+
+    def _feed(self, source, outbox, workers):
+        """Source thread: numbers the source items and passes them to the first stage."""
+        try:
+            for seq, item in enumerate(source):
+                self.put(outbox, (seq, item))
+            for _ in range(workers):
+                self.put(outbox, self._END)
+        except PipelineStopped:
+            pass
+        except BaseException as e:
+            self._fail(e)
+
+    def _work(self, index, inbox, outbox, downstream):
+        """Stage worker: maps items until the end marker; the last worker out forwards it."""
+        name, fn, _, ordered = self.stages[index]
+        busy = 0.0
+        count = 0
+        try:
+            for seq, item in self._items(inbox, ordered):
+                start = time.perf_counter()
+                result = fn(item)
+                busy += time.perf_counter() - start
+                count += 1
+                self.put(outbox, (seq, result))
+            with self._lock:
+                self._running[index] -= 1
+                last = self._running[index] == 0
+            if last:
+                for _ in range(downstream):
+                    self.put(outbox, self._END)
+        except PipelineStopped:
+            pass
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            with self._lock:
+                self.stats[f"pipeline_{name}_time"] += busy
+                self.stats[f"pipeline_{name}_items"] += count
+
+    def run(self, source, sink):
+        """
+        Pushes every item of `source` through the stages and into `sink`, in order.
+
+        Args:
+            source (iterable): Items to process; iterated on a separate thread.
+            sink (callable): Called on this thread with every final result, in source order.
+
+        Raises:
+            Exception: The first error raised by the source, a stage or the sink.
+        """
+        workers = [stage[2] for stage in self.stages]
+        queues = [queue.Queue(maxsize=self.depth * n) for n in workers] + [queue.Queue(maxsize=self.depth)]
+        self._running = list(workers)
+        
+        self._threads.append(threading.Thread(target=self._feed, args=(source, queues[0], workers[0]),
+                                              name="pipeline-source", daemon=True))
+        for index, (name, _, count, _) in enumerate(self.stages):
+            downstream = workers[index + 1] if index + 1 < len(workers) else 1
+            for n in range(count):
+                self._threads.append(threading.Thread(
+                    target=self._work, args=(index, queues[index], queues[index + 1], downstream),
+                    name=f"pipeline-{name}-{n}", daemon=True))
+        for thread in self._threads:
+            thread.start()
+        
+        try:
+            for _, item in self._items(queues[-1], ordered=True):
+                sink(item)
+        except PipelineStopped:
+            pass
+        finally:
+            self.close()
+        if self._error is not None:
+            raise self._error
+
+    def close(self):
+        """Stops every pipeline thread; items still in flight are dropped."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        self._threads = []
+
+
+def attach_shared_memory(name):
+    """
+    Attaches to an existing shared memory block without taking ownership of it.
+
+    Only the creating process unlinks the block. Pool workers share their parent's
+    resource tracker, so on Pythons without `track` the extra registration made
+    by attaching is harmless.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedFrameRing:
+    """
+    Fixed ring of frame and output slots in one shared memory block.
+
+    Decoded frames are read straight into the frame slots, and workers write the
+    encoded bytes into the output slot with the same index, so only slot indices
+    cross process boundaries and pixels are never pickled. Layout: a (slots, 2)
+    int64 table of output length and per-cell encoding size, then the frames,
+    then the outputs.
+    """
+
+    def __init__(self, slots, frame_shape, output_size, name=None):
+        """
+        Args:
+            slots (int): Number of frames that can be in flight at once.
+            frame_shape (tuple): (H, W, 3) shape of the decoded frames.
+            output_size (int): Upper bound on the encoded size of one frame.
+            name (str, optional): Attach to an existing ring instead of creating one.
+        """
+        self.slots = slots
+        self.frame_shape = tuple(frame_shape)
+        self.output_size = output_size
+        self.owner = name is None
+        
+        frame_size = int(np.prod(self.frame_shape))
+        table_size = slots * 2 * 8
+        size = table_size + slots * (frame_size + output_size)
+        self.shm = shared_memory.SharedMemory(create=True, size=size) if self.owner else attach_shared_memory(name)
+        self._base = np.frombuffer(self.shm.buf, dtype=np.uint8)
+        self._frame_size = frame_size
+        self.lengths = self._base[:table_size].view(np.int64).reshape(slots, 2)
+        self.frames = self._base[table_size:table_size + slots * frame_size].reshape((slots,) + self.frame_shape)
+        self.outputs = self._base[table_size + slots * frame_size:].reshape(slots, output_size)
+
+    def spec(self):
+        """Picklable arguments that attach another process to this ring."""
+        return (self.slots, self.frame_shape, self.output_size, self.shm.name)
+
+    def index_of(self, frame):
+        """Slot index of a frame view into this ring, or None if it lives elsewhere."""
+        if frame.shape != self.frame_shape:
+            return None
+        offset = frame.__array_interface__["data"][0] - self.frames.__array_interface__["data"][0]
+        index, rest = divmod(offset, self._frame_size)
+        return index if rest == 0 and 0 <= index < self.slots else None
+
+    def close(self):
+        """Detaches from the ring; the creating process also frees it."""
+        self.lengths = self.frames = self.outputs = self._base = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass # Views still referenced elsewhere; the mapping goes away with them
+        if self.owner:
+            self.shm.unlink()
+
+
+# Per-process state of the process pool workers: (renderer, ring)
+_process_worker = None
+
+
+def _process_worker_init(options, ring_spec):
+    """Process pool initializer: attaches to the shared ring and builds a renderer."""
+    global _process_worker
+    
+    # Ctrl+C reaches the whole process group; the parent shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _process_worker = (PixelStreamBot(**options), SharedFrameRing(*ring_spec))
+
+
+def _process_worker_encode(index):
+    """Renders and encodes the frame in ring slot `index` into the matching output slot."""
+    bot, ring = _process_worker
+    grid = bot.render_cells(ring.frames[index])
+    encoded = bot.encode_frame(grid, bot.context)
+    ring.outputs[index, :len(encoded)] = np.frombuffer(encoded, dtype=np.uint8)
+    ring.lengths[index] = (len(encoded), grid.fixed_frame_size() if grid.layers else 0)
+    return index
+
+
+class ProcessRenderer:
+    """
+    Process pool backend for rendering and encoding frames.
+
+    Frames are decoded into the slots of a SharedFrameRing and every worker
+    process renders with its own copy of the player settings. Like
+    `PixelStreamBot.render_frame`, `render_frame(frame)` returns the encoded
+    bytes, so it can stand in for the in-process renderer; it is safe to call
+    from several threads at once, one frame per call.
+    """
+
+    def __init__(self, options, processes, ring, stats=None):
+        """
+        Args:
+            options (dict): PixelStreamBot keyword arguments for the worker renderers.
+            processes (int): Number of worker processes.
+            ring (SharedFrameRing): Ring the frames are decoded into; owned by this renderer.
+            stats (Counter, optional): Receives color byte counters.
+        """
+        self.ring = ring
+        self.stats = stats if stats is not None else Counter()
+        self.pool = multiprocessing.Pool(processes, _process_worker_init, (options, ring.spec()))
+        self._lock = threading.Lock()
+
+    def render_frame(self, frame):
+        """Encodes a frame stored in the ring on a worker process and returns its bytes."""
+        index = self.ring.index_of(frame)
+        if index is None:
+            raise RuntimeError("Frame is not stored in the shared frame ring "
+                               "(decoded size differs from the stream header?)")
+        self.pool.apply(_process_worker_encode, (index,))
+        length, per_cell = self.ring.lengths[index]
+        encoded = self.ring.outputs[index, :length].tobytes()
+        
+        if per_cell:
+            with self._lock:
+                self.stats["color_frames"] += 1
+                self.stats["color_bytes"] += length - len(CURSOR_HOME)
+                self.stats["color_bytes_per_cell"] += per_cell
+        return encoded
+
+    def close(self):
+        """Stops the worker processes and frees the ring."""
+        self.pool.terminate()
+        self.pool.join()
+        self.ring.close()
+
+
+class FramePacer:
+    """
+    Presents frames at absolute deadlines on a monotonic clock.
+
+    Frame n is due at start + n * frame time, so sleep overshoot and slow frames
+    never add up to drift, across loop passes included. The pacer tracks how
+    long after one presentation the next frame is typically ready; a frame that,
+    behind every frame still in flight, would be presented more than one frame
+    time late is dropped before rendering, so playback catches up with real time
+    instead of falling further behind. A late frame is still shown when nothing
+    newer is ready to replace it, or when the picture has gone stale and no other
+    frame is on its way, so playback keeps moving even if decoding alone takes
+    longer than a frame time. Waiting sleeps until shortly before the
+    deadline and spins for the rest, because sleep() can overshoot by a good part
+    of a millisecond; with `spin` off it only sleeps, trading that precision for
+    an idle CPU.
+    """
+
+    # Final stretch before a deadline that is spun instead of slept
+    SPIN_NS = 1_000_000
+    # Age in frame times after which the picture is replaced by the next frame, however late
+    STALE_FRAMES = 4
+
+    def __init__(self, frame_delay, stats=None, spin=True):
+        """
+        Args:
+            frame_delay (float): Time between frames in seconds.
+            stats (Counter, optional): Receives drop and presentation jitter counters.
+            spin (bool): Spin through the last stretch before each deadline.
+        """
+        self.frame_ns = max(int(frame_delay * 1e9), 1)
+        self.spin_ns = self.SPIN_NS if spin else 0
+        self.stats = stats if stats is not None else Counter()
+        self.start_ns = None
+        self.frames = 0
+        self.base = 0
+        self.interval_ns = 0
+        self.last_present = None
+        self._in_flight = set()
+
+    def start_pass(self, first_position=0):
+        """Continues the clock where the previous loop pass ended; `first_position` is shown first."""
+        self.base = self.frames - first_position
+
+    def next_frame(self, position=None):
+        """
+        Returns the presentation index of the next frame; the clock starts with the first one.
+
+        Args:
+            position (int, optional): Frame number within the current pass, so frames
+                skipped by the decoder keep their time slots.
+        """
+        if self.start_ns is None:
+            self.start_ns = time.perf_counter_ns()
+        index = self.frames if position is None else self.base + position
+        # The decoder may already have dropped later frames; their slots stay used
+        self.frames = max(self.frames, index + 1)
+        self._in_flight.add(index)
+        return index
+
+    def deadline(self, index):
+        """Presentation time of frame `index` in perf_counter_ns() units."""
+        return self.start_ns + index * self.frame_ns
+
+    def is_late(self, index, queued=0, newer=True):
+        """
+        True if frame `index` would be more than one frame time overdue once rendered.
+
+        Args:
+            index (int): Presentation index of the frame.
+            queued (int): Frames waiting ahead of it that are not in flight yet.
+            newer (bool): Whether a later frame is on hand to be shown instead.
+        """
+        if self.last_present is None or not newer:
+            return False
+        pending = len(self._in_flight) + queued + (index not in self._in_flight)
+        now = time.perf_counter_ns()
+        if pending == 1 and now - self.last_present > self.STALE_FRAMES * self.frame_ns:
+            return False # The next frame to be shown; dropping it would freeze the picture
+        presented = max(now, self.last_present + pending * self.interval_ns)
+        if presented - self.deadline(index) > self.frame_ns:
+            self.drop(index)
+            return True
+        return False
+
+    def drop(self, index):
+        """Gives up on frame `index` without presenting it."""
+        # Dropped frames still use up their slot, so the next loop pass starts after them
+        self.frames = max(self.frames, index + 1)
+        self._in_flight.discard(index)
+        self.stats["pacer_dropped"] += 1
+
+    def wait(self, index):
+        """Blocks until frame `index` is due and records how far presentation missed its deadline."""
+        deadline = self.deadline(index)
+        ready = time.perf_counter_ns()
+        self._in_flight.discard(index)
+        if self.last_present is not None:
+            self.interval_ns += (max(ready - self.last_present, 0) - self.interval_ns) // 8
+        
+        remaining = deadline - ready
+        if remaining > self.spin_ns:
+            time.sleep((remaining - self.spin_ns) / 1e9)
+        
+        # sleep(0) keeps the GIL available to the pipeline threads while spinning
+        now = time.perf_counter_ns()
+        while self.spin_ns and now < deadline:
+            time.sleep(0)
+            now = time.perf_counter_ns()
+        self.last_present = now
+        
+        self.stats["pacer_frames"] += 1
+        self.stats["pacer_lag_ns"] += now - deadline
+        self.stats["pacer_lag_max_ns"] = max(self.stats["pacer_lag_max_ns"], now - deadline)
+
+
+class QualityController:
+    """
+    Closed-loop quality control that keeps the per-frame cost within the frame budget.
+
+    Per-frame render and write times are averaged over a rolling window. When
+    the average goes over budget the controller steps one tier down a ladder
+    ordered from best to cheapest; when `patience` whole windows in a row stay
+    under `headroom` times the budget it steps back up. A tier that was left for
+    being over budget is only retried once the cost it had then, scaled by how
+    much cheaper frames have become since, fits the budget with a margin. Every
+    change starts a fresh window, and a tier that has to be left again within
+    its first window after a step up needs twice as many windows of headroom
+    before the next attempt, so the controller settles instead of oscillating.
+    Transitions are logged to the "pixelstream.quality" logger.
+    """
+
+    # Share of the budget the predicted cost of a tier that was too slow must stay under to retry it
+    RETRY_MARGIN = 0.9
+
+    def __init__(self, tiers, budget, window=30, headroom=0.6, patience=3, describe=str):
+        """
+        Args:
+            tiers (list): Quality tiers from best to cheapest; the first one is active initially.
+            budget (float): Time available per frame in seconds.
+            window (int): Number of frames averaged before each decision.
+            headroom (float): Fraction of the budget a window must stay under to step up.
+            patience (int): Windows of headroom needed before the first step up to a tier.
+            describe (callable): Formats a tier for the log.
+        """
+        self.tiers = tiers
+        self.budget = budget
+        self.window = window
+        self.headroom = headroom
+        self.describe = describe
+        self.level = 0
+        self.samples = deque(maxlen=window)
+        self.patience = [patience] * len(tiers)
+        self.failed_cost = [None] * len(tiers) # Average cost when the tier was last left as too slow
+        self.entry_cost = [None] * len(tiers) # Average cost of the first window after stepping down to a tier
+        self.calm_windows = 0
+        self.probation = False
+        self.log = logging.getLogger("pixelstream.quality")
+
+    @property
+    def tier(self):
+        """The active quality tier."""
+        return self.tiers[self.level]
+
+    def record(self, seconds):
+        """
+        Adds the cost of one frame.
+
+        Returns:
+            bool: True if the active tier changed.
+        """
+        self.samples.append(seconds)
+        if len(self.samples) < self.window:
+            return False
+        average = sum(self.samples) / len(self.samples)
+        if self.entry_cost[self.level] is None:
+            self.entry_cost[self.level] = average
+        
+        if average > self.budget:
+            if self.level + 1 == len(self.tiers):
+                return False
+            if self.probation:
+                # Stepped up into a tier we can't sustain; wait longer before retrying it
+                self.patience[self.level] *= 2
+            self.failed_cost[self.level] = average
+            self.entry_cost[self.level + 1] = None
+            return self._step(self.level + 1, average)
+        self.probation = False
+        
+        if self.level and average < self.headroom * self.budget:
+            # Count whole windows of headroom rather than frames
+            self.calm_windows += 1
+            if self.calm_windows >= self.patience[self.level - 1] and self._fits(self.level - 1, average):
+                self._step(self.level - 1, average)
+                self.probation = True
+                return True
+            self.samples.clear()
+        else:
+            self.calm_windows = 0
+        return False
+
+    def _fits(self, level, average):
+        """Whether the richer tier `level` is expected to fit the budget at today's frame costs."""
+        failed, entry = self.failed_cost[level], self.entry_cost[level + 1]
+        if failed is None or not entry:
+            return True
+        return failed * average / entry < self.RETRY_MARGIN * self.budget
+
+    def _step(self, level, average):
+        """Switches to another tier, logs the transition and starts a fresh window."""
+        self.log.info("Quality %s -> %s: %.1f ms/frame over the last %d frames (budget %.1f ms)",
+                      self.describe(self.tier), self.describe(self.tiers[level]),
+                      1000 * average, len(self.samples), 1000 * self.budget)
+        self.level = level
+        self.samples.clear()
+        self.calm_windows = 0
+        self.probation = False
+        return True
+
+
+class CpuGovernor:
+    """
+    Keeps playback under a share of one CPU core for long unattended runs.
+
+    Process CPU time (every thread, decoding included) is compared with wall
+    time over windows of a few seconds. Over budget, the governor first lowers
+    the effective frame rate by showing only every `stride`-th frame. The
+    decoder still grabs the frames in between, and grab() decodes them, so a
+    higher stride only saves their conversion, rendering and output. Once
+    raising the stride stops cutting usage roughly in proportion (decoding
+    dominates), or the frame rate is at its floor, the governor steps down the
+    quality ladder instead. With enough headroom it undoes the changes in
+    reverse order: quality first, then frame rate. A quality level that turns
+    out too expensive right after stepping up to it needs twice as many windows
+    of headroom before the next attempt. Changes are logged to the
+    "pixelstream.cpu" logger.
+    """
+
+    def __init__(self, budget, fps, levels=1, window=3.0, min_fps=2, headroom=0.7):
+        """
+        Args:
+            budget (float): Allowed CPU share, as a fraction of one core.
+            fps (float): Frame rate shown at stride 1.
+            levels (int): Number of quality tiers available to step through.
+            window (float): Measurement window in seconds.
+            min_fps (float): Lowest effective frame rate before quality is lowered.
+            headroom (float): Fraction of the budget usage must stay under to step back up.
+        """
+        self.budget = budget
+        self.fps = fps
+        self.levels = levels
+        self.window = window
+        self.max_stride = max(int(fps // min_fps), 1)
+        self.headroom = headroom
+        self.stride = 1
+        self.level = 0
+        self.usage = None
+        self.changes = 0
+        self.patience = [1] * levels
+        self.calm_windows = 0
+        self.probation = False
+        self.raised_from = None # (stride, usage) before the last stride increase
+        self.log = logging.getLogger("pixelstream.cpu")
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+
+    def record(self):
+        """
+        Called once per presented frame; re-evaluates at the end of each window.
+
+        Returns:
+            bool: True if the stride or quality level changed.
+        """
+        wall = time.perf_counter()
+        if wall - self._wall < self.window:
+            return False
+        cpu = time.process_time()
+        self.usage = (cpu - self._cpu) / (wall - self._wall)
+        self._wall, self._cpu = wall, cpu
+        
+        stride, level = self.stride, self.level
+        probation, self.probation = self.probation, False
+        raised_from, self.raised_from = self.raised_from, None
+        if raised_from is not None:
+            # Judge the last stride increase against the saving it should have brought
+            old_stride, old_usage = raised_from
+            expected = old_usage * (1 - old_stride / stride)
+            if old_usage - self.usage < 0.5 * expected:
+                self.log.info("CPU %.1f%% of one core at %.1f fps, %.1f%% at %.1f fps: "
+                              "a lower frame rate no longer pays off, lowering quality instead",
+                              100 * old_usage, self.fps / old_stride, 100 * self.usage, self.fps / stride)
+                self.max_stride = stride
+        
+        if self.usage > self.budget:
+            self.calm_windows = 0
+            if probation:
+                self.patience[level] *= 2
+            if stride < self.max_stride:
+                # Cost scales roughly with frames shown, so jump straight to the estimate
+                stride = min(max(math.ceil(stride * self.usage / self.budget), stride + 1), self.max_stride)
+                self.raised_from = (self.stride, self.usage)
+            elif level + 1 < self.levels:
+                level += 1
+        elif self.usage < self.headroom * self.budget:
+            self.calm_windows += 1
+            if level:
+                if self.calm_windows >= self.patience[level - 1]:
+                    level -= 1
+                    self.calm_windows = 0
+                    self.probation = True
+            elif stride > 1:
+                # Only as far as the measurement says still fits
+                stride = max(math.floor(stride * self.usage / (self.headroom * self.budget)), 1, stride // 2)
+        else:
+            self.calm_windows = 0
+        
+        if (stride, level) == (self.stride, self.level):
+            return False
+        self.log.info("CPU %.1f%% of one core (budget %.1f%%): showing %.1f fps -> %.1f fps, quality level %d -> %d",
+                      100 * self.usage, 100 * self.budget, self.fps / self.stride, self.fps / stride,
+                      self.level, level)
+        self.stride, self.level = stride, level
+        self.changes += 1
+        return True
+
+
+def query_synchronized_output(timeout=2.0):
+    """
+    Asks the terminal whether it supports synchronized output (DEC mode 2026).
+
+    Sends a DECRQM request followed by a primary device attributes (DA1)
+    request. Terminals that don't know DECRQM answer "not recognized" or not at
+    all, but every terminal answers DA1, and replies come back in order, so the
+    DA1 reply marks the end of the answer however long a remote link takes.
+
+    Args:
+        timeout (float): Seconds to wait at most, for something that isn't a terminal after all.
+
+    Returns:
+        bool: True if the terminal reported the mode as recognized.
+    """
+    try:
+        import termios
+    except ImportError:
+        return False
+    if not (sys.stdin.isatty() and sys.stdout.isatty()):
+        return False
+    
+    fd = sys.stdin.fileno()
+    saved = termios.tcgetattr(fd)
+    try:
+        # Read the reply without waiting for Enter and without echoing it
+        raw = termios.tcgetattr(fd)
+        raw[3] &= ~(termios.ICANON | termios.ECHO)
+        termios.tcsetattr(fd, termios.TCSANOW, raw)
+        os.write(sys.stdout.fileno(), b"\033[?2026$p\033[c")
+        
+        reply = b""
+        deadline = time.monotonic() + timeout
+        while not re.search(rb"\033\[\?[\d;]*c", reply):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                break
+            reply += os.read(fd, 64)
+    finally:
+        termios.tcsetattr(fd, termios.TCSANOW, saved)
+    
+    # Reply: CSI ? 2026 ; Ps $ y with Ps 1-3 = supported, 0 = unknown, 4 = permanently off
+    match = re.search(rb"\?2026;(\d)\$y", reply)
+    return bool(match) and match.group(1) in (b"1", b"2", b"3")
+
+
+class TerminalWriter:
+    """
+    Writes encoded frames straight to the terminal's file descriptor.
+
+    Each frame goes out in a single os.writev() call: the frame bytes plus, when
+    synchronized output is on, the DEC 2026 begin/end markers around them, so
+    the terminal repaints once per frame instead of as bytes arrive, and nothing
+    is copied or re-encoded on the way. Short writes (a full pipe or a slow pty)
+    are finished with os.write(). On Windows, or without a usable descriptor,
+    frames go through sys.stdout.buffer instead: the console reads raw writes in
+    its code page, which would garble the UTF-8 block and braille glyphs.
+    """
+
+    def __init__(self, sync=False, stats=None):
+        """
+        Args:
+            sync (bool): Wrap frames in synchronized-update markers.
+            stats (Counter, optional): Receives byte, syscall and blocking counters.
+        """
+        self.sync = sync
+        self.stats = stats if stats is not None else Counter()
+        self.fd = None
+        if os.name != "nt":
+            try:
+                sys.stdout.flush()
+                self.fd = sys.stdout.fileno()
+            except (AttributeError, OSError, ValueError):
+                pass
+        self.writev = getattr(os, "writev", None)
+
+    def write(self, output):
+        """
+        Writes one frame and returns the time spent blocked in the write, in seconds.
+        """
+        parts = [SYNC_BEGIN, output, SYNC_END] if self.sync else [output]
+        total = sum(len(part) for part in parts)
+        start = time.perf_counter()
+        if self.fd is None:
+            for part in parts:
+                sys.stdout.buffer.write(part)
+            sys.stdout.buffer.flush()
+            calls = 1
+        elif self.writev is not None:
+            written = self.writev(self.fd, parts)
+            calls = 1
+            if written < total:
+                calls += self._finish(b"".join(parts), written)
+        else:
+            data = b"".join(parts) if self.sync else output
+            calls = self._finish(data, 0)
+        elapsed = time.perf_counter() - start
+        
+        self.stats["writer_bytes"] += total
+        self.stats["writer_calls"] += calls
+        self.stats["writer_short_writes"] += calls - 1
+        self.stats["writer_blocked_time"] += elapsed
+        self.stats["writer_blocked_max"] = max(self.stats["writer_blocked_max"], elapsed)
+        return elapsed
+
+    def _finish(self, data, offset):
+        """Writes `data` from `offset` on with os.write(); returns the number of calls."""
+        view = memoryview(data)
+        calls = 0
+        while offset < len(data):
+            offset += os.write(self.fd, view[offset:])
+            calls += 1
+        return calls
+
+
+class OutputMonitor:
+    """
+    Detects terminal backpressure and picks how much each frame may cost to send.
+
+    Over SSH or with a slow emulator, writes block once the terminal's buffers
+    are full. Over each window of frames the monitor compares the time spent
+    blocked in writes with the frame time. When writes blocked for a noticeable
+    share of it, the terminal is the bottleneck and drained its buffers the
+    whole time, so bytes written per second of the window estimate its
+    throughput (smoothed across windows); a window ends early once writes have
+    blocked for as long as the whole window should have lasted. The per-frame
+    byte budget is that throughput times the frame time, less some margin.
+
+    Levels index a ladder of encodings from richest to cheapest. The monitor
+    steps down while frames are bigger than the budget. Windows without
+    blocking raise the throughput estimate a little, up to twice what was last
+    measured under congestion, and the monitor steps back up once the bytes
+    last seen at the richer level fit the budget. Terminal buffers hide
+    congestion for a while, so a level that blocks again within a few windows
+    of a step up needs twice as many calm windows before the next attempt.
+    Changes are logged to the "pixelstream.output" logger.
+    """
+
+    # Windows after a step up in which congestion counts against the new level
+    PROBATION = 3
+
+    def __init__(self, levels, window=30, blocked_share=0.25, margin=0.8, describe=str):
+        """
+        Args:
+            levels (int): Number of encoding levels; level 0 is the configured output.
+            window (int): Frames per measurement window.
+            blocked_share (float): Share of the frame time spent blocked that counts as backpressure.
+            margin (float): Fraction of the estimated throughput budgeted for frames.
+            describe (callable): Formats a level for the log.
+        """
+        self.levels = levels
+        self.window = window
+        self.blocked_share = blocked_share
+        self.margin = margin
+        self.describe = describe
+        self.level = 0
+        self.throughput = None
+        self.measured = None
+        self.budget = None
+        self.changes = 0
+        self.level_bytes = [None] * levels
+        self.patience = [1] * levels
+        self.calm_windows = 0
+        self.probation = 0
+        self.log = logging.getLogger("pixelstream.output")
+        self._frames = 0
+        self._bytes = 0
+        self._blocked = 0.0
+        self._interval = 0.0
+        self._started = None
+
+    def record(self, nbytes, blocked, interval):
+        """
+        Adds one written frame.
+
+        Args:
+            nbytes (int): Bytes written.
+            blocked (float): Seconds spent blocked in the write.
+            interval (float): Frame time the frame was shown for, in seconds.
+
+        Returns:
+            bool: True if the encoding level changed.
+        """
+        now = time.perf_counter()
+        if self._started is None:
+            # The first frame's write ends the previous window's clock
+            self._started = now - blocked
+        self._frames += 1
+        self._bytes += nbytes
+        self._blocked += blocked
+        self._interval += interval
+        
+        # A badly congested terminal ends the window early: its frames take far longer than planned
+        if self._frames < self.window and self._blocked < self.window * interval:
+            return False
+        
+        frame_bytes = self._bytes / self._frames
+        frame_time = self._interval / self._frames
+        congested = self._blocked > self.blocked_share * self._interval
+        if congested:
+            sample = self._bytes / (now - self._started)
+            self.measured = sample if self.measured is None else (self.measured + sample) / 2
+            self.throughput = self.measured
+        elif self.throughput is not None:
+            # Nothing blocked: the terminal may be faster now than when last measured
+            self.throughput = min(self.throughput * 1.1, 2 * self.measured)
+        self.level_bytes[self.level] = frame_bytes
+        self._frames = self._bytes = 0
+        self._blocked = self._interval = 0.0
+        self._started = None
+        if self.throughput is None:
+            return False
+        self.budget = self.margin * self.throughput * frame_time
+        
+        probation, self.probation = self.probation, max(self.probation - 1, 0)
+        if congested and frame_bytes > self.budget:
+            self.calm_windows = 0
+            if probation:
+                self.patience[self.level] *= 2
+            if self.level + 1 < self.levels:
+                return self._step(self.level + 1, frame_bytes)
+            return False
+        
+        richer = self.level_bytes[self.level - 1] if self.level else None
+        if not congested and richer is not None and richer <= self.budget:
+            self.calm_windows += 1
+            if self.calm_windows >= self.patience[self.level - 1]:
+                self._step(self.level - 1, frame_bytes)
+                self.probation = self.PROBATION
+                return True
+        else:
+            self.calm_windows = 0
+        return False
+
+    def _step(self, level, frame_bytes):
+        """Switches to another encoding level and logs why."""
+        self.log.info("Output %s -> %s: %.0f bytes/frame, terminal ~%.0f KB/s, budget %.0f bytes/frame",
+                      self.describe(self.level), self.describe(level), frame_bytes,
+                      self.throughput / 1000, self.budget)
+        self.level = level
+        self.calm_windows = 0
+        self.changes += 1
+        return True
+
 
 class PixelStreamBot:
     """
@@ -37,7 +2509,12 @@ class PixelStreamBot:
     with TrueColor ANSI support and dynamic resolution scaling.
     """
     
-    def __init__(self, video_path, width=None, color=False, loop=False):
+    def __init__(self, video_path, width=None, color=False, loop=False, colors=None,
+                 coalesce=False, quantize=0, show_stats=False, delta="off", refresh_interval=300,
+                 mode="ascii", dither="none", prefetch=4, workers=1, threads=None,
+                 backend="threads", speed=1, start=0.0,
+                 adaptive=False, cpu_budget=None, sync="auto", backpressure=False,
+                 cache_limit=256 << 20, cache_compress=False, cache_dir=None, cache_dir_limit=1 << 30):
         """
         Initialize the PixelStream engine.
         
@@ -46,19 +2523,131 @@ class PixelStreamBot:
             width (int, optional): Force output width. If None, auto-detects terminal size.
             color (bool): Enable RGB TrueColor output (requires compatible terminal).
             loop (bool): Seamless loop mode for continuous playback.
+            colors (str, optional): Color depth ("truecolor", "256", "16"); implies color.
+            coalesce (bool): Emit one color sequence per run of equal colors instead of per cell.
+            quantize (int): Drop this many low bits per color channel (0-7) to lengthen color runs.
+            show_stats (bool): Print rendering statistics when playback ends.
+            delta (str): Output stage: "off" redraws every frame, "rows" rewrites only changed
+                rows, "cells" sends only changed cells.
+            refresh_interval (int): In delta mode, force a full redraw every N frames.
+            mode (str): Cell renderer: "ascii" charset, "halfblock" (always in color) or
+                "braille" 2x4 dot patterns.
+            dither (str): Ordered dithering before quantization: "none", "bayer" or "bluenoise".
+            prefetch (int): Number of frames decoded ahead on a background thread (0 = off).
+            workers (int): Threads for each of the render and encode pipeline stages; 0 renders,
+                encodes and writes every frame in the playback loop itself.
+            threads (int, optional): Threads for row-striped color lookups and encoding
+                (default: CPU count, 1 disables striping).
+            backend (str): Where pipeline workers render and encode: "threads" in this process,
+                or "processes" in a pool fed through shared memory.
+            speed (int): Playback speed factor; frames in between are skipped without decoding
+                them to BGR.
+            start (float): Start offset in seconds (applies to every loop pass).
+            adaptive (bool): Trade output width, color depth and resize quality for speed
+                whenever rendering falls behind the frame rate.
+            cpu_budget (float, optional): Keep process CPU usage under this share of one
+                core by lowering the frame rate, then quality.
+            sync (str): Synchronized output: "on", "off" or "auto" (ask the terminal).
+            backpressure (bool): Switch to cheaper encodings (delta, then lower quality)
+                when the terminal can't take frames as fast as they are written.
+            cache_limit (int): With `loop`, memory in bytes for replaying encoded
+                frames on later passes instead of decoding them again (0 disables).
+            cache_compress (bool): zlib-compress cached frames.
+            cache_dir (str, optional): Directory of a render cache shared between runs
+                and players; complete renders are stored there and replayed without decoding.
+            cache_dir_limit (int): Size limit of the render cache directory in bytes.
         """
         self.video_path = video_path
-        self.color = color
+        self.mode = mode
+        self.color = color or colors is not None or mode == "halfblock"
+        self.palette = make_palette(colors or "truecolor") if self.color else None
+        self._backgrounds = {}
+        self.dither = dither
+        self.dither_matrix = dither_matrix(dither) if dither != "none" else None
         self.loop = loop
+        self.coalesce = coalesce
+        self.quantize = quantize
+        self.show_stats = show_stats
+        self.prefetch = prefetch
+        self.workers = workers
+        self.stripes = StripePool(threads) if (threads or os.cpu_count() or 1) > 1 else None
+        self.backend = backend
+        self.speed = max(int(speed), 1)
+        self.start = start
+        if backend == "processes" and delta != "off":
+            print("[System] Delta encoding needs frames in order; using the thread backend")
+            self.backend = "threads"
+        if backend == "processes" and adaptive:
+            print("[System] Adaptive quality changes render settings mid-stream; using the thread backend")
+            self.backend = "threads"
+        if backend == "processes" and backpressure:
+            print("[System] Backpressure control may switch to delta encoding; using the thread backend")
+            self.backend = "threads"
+        if backend == "processes" and cpu_budget:
+            print("[System] The CPU budget only measures this process; using the thread backend")
+            self.backend = "threads"
+        self.adaptive = adaptive
+        self.quality = None
+        self.cpu_budget = cpu_budget
+        self.governor = None
+        self._tiers = None
+        self.sync = sync
+        self.writer = None
+        self.backpressure = backpressure
+        self.output_monitor = None
+        self._encodings = None
+        self.stats = Counter()
+        
+        # Cached frames are replayed as written, which delta frames can't be
+        self.loop_cache = None
+        if loop and cache_limit and delta == "off":
+            self.loop_cache = LoopCache(cache_limit, compress=cache_compress, stats=self.stats)
+        elif loop and cache_limit:
+            print("[System] Delta frames can't be replayed out of context; loop cache disabled")
+        self.cache_compress = cache_compress
+        self.disk_cache = RenderCache(cache_dir, cache_dir_limit, stats=self.stats) if cache_dir else None
+        self.recorder = None
+        if cache_dir and delta != "off":
+            print("[System] Delta frames can't be replayed out of context; render cache disabled")
+        
+        self.delta = delta
+        self.damage = (RowTracker if delta == "rows" else DamageTracker)(refresh_interval)
+        
+        # Delta mode in effect; backpressure control may move it to "cells"
+        self.encoding = delta
+        self._trackers = {delta: self.damage}
         
         # High-density ASCII character map sorted by pixel brightness (Dark -> Light)
         # Optimized for standard terminal font aspect ratios.
         self.ascii_chars = r"$@B%8&WM#*oahkbdpqwmZO0QLCJUYXzcvunxrjft/\|()1{}[]?-_+~<>i!lI;:,\"^`'. "
 
+        # Byte-level lookup table (glyph index -> ASCII code) used by the
+        # vectorized renderers to emit frames without per-cell Python objects.
+        self.glyph_lut = np.frombuffer(self.ascii_chars.encode("ascii"), dtype=np.uint8)
+
+        # Per-stream geometry and scratch buffers, set up when a stream opens
+        self.context = None
+        
+        # Render contexts for frames in flight through the pipeline
+        self._slots = []
+        self._process_renderer = None
+
         # Initialize Auto-Sizing Intelligence
         self.width = width
-        if self.width is None:
+        if self.width is None and PxsReader.is_container(video_path):
+            # Pre-rendered: the container fixes the geometry
+            container = PxsReader(video_path)
+            self.width = container.columns
+            container.close()
+        elif self.width is None:
             self._set_auto_dimensions()
+        
+        # Output settings new render contexts are opened with: (width, palette, interpolation)
+        self.tier = (self.width, self.palette, None)
+        self._base_tier = self.tier
+        self._shown_tier = None
+        self._encoded_as = None
+        self._frame_interval = None
 
     def _set_auto_dimensions(self):
         """
@@ -108,108 +2697,920 @@ class PixelStreamBot:
         print(f"[System] Auto-detected terminal: {term_w}x{term_h}")
         print(f"[System] Auto-sizing video to width: {self.width}")
 
+    def _new_context(self, source_width, source_height, stats=None):
+        """Creates a render context for the current quality tier."""
+        width, palette, interpolation = self.tier
+        return RenderContext(source_width, source_height, width, stats=stats, stripes=self.stripes,
+                             palette=palette, interpolation=interpolation)
+
+    def open_context(self, source_width, source_height):
+        """Fixes the output geometry for a stream and starts a fresh set of scratch buffers."""
+        self.context = self._new_context(source_width, source_height, stats=self.stats)
+        return self.context
+
+    def _context_for(self, frame):
+        """Returns the render context for this frame, opening one if the geometry or tier changed."""
+        ctx = self.context
+        if ctx is None or not ctx.matches(frame, self.tier):
+            ctx = self.open_context(frame.shape[1], frame.shape[0])
+        return ctx
+
+    def quality_tiers(self):
+        """
+        Quality ladder for adaptive playback, from the configured output to the cheapest.
+
+        Output width is reduced first, then color depth (TrueColor -> 256 -> 16 ->
+        mono, where the mode allows it), then resizing drops to nearest neighbour.
+        """
+        width, palette, interpolation = self.tier
+        tiers = [self.tier]
+        for scale in (0.75, 0.5):
+            narrower = max(int(width * scale), 16)
+            if narrower < tiers[-1][0]:
+                tiers.append((narrower, palette, interpolation))
+        
+        width = tiers[-1][0]
+        if palette is not None:
+            depths = ["truecolor", "256", "16"]
+            for name in depths[depths.index(palette.name) + 1:]:
+                tiers.append((width, make_palette(name), interpolation))
+            if self.mode != "halfblock":
+                tiers.append((width, None, interpolation))
+        tiers.append((width, tiers[-1][1], cv2.INTER_NEAREST))
+        return tiers
+
+    @staticmethod
+    def describe_tier(tier):
+        """Human-readable summary of a quality tier."""
+        width, palette, interpolation = tier
+        colors = {None: "mono", "truecolor": "24-bit color", "256": "256 colors", "16": "16 colors"}
+        resize = "nearest" if interpolation == cv2.INTER_NEAREST else "area/linear"
+        return f"{width} cols, {colors[palette.name if palette else None]}, {resize} resize"
+
+    def encoding_levels(self):
+        """
+        Encoding ladder for backpressure control: (delta mode, quality tier index) pairs.
+
+        Delta encoding is made as aggressive as it goes first, since it costs no
+        picture quality; after that the quality tiers are stepped through.
+        """
+        levels = [(self.delta, 0)]
+        if self.delta != "cells":
+            levels.append(("cells", 0))
+        levels.extend(("cells", level) for level in range(1, len(self._tiers)))
+        return levels
+
+    def describe_encoding(self, level):
+        """Human-readable summary of a backpressure encoding level."""
+        delta, tier = self._encodings[level]
+        return f"delta {delta}, {self.describe_tier(self._tiers[tier])}"
+
+    def _record_cost(self, busy, blocked):
+        """
+        Feeds one presented frame to the adaptive quality controller and the CPU governor.
+
+        Args:
+            busy (float): Render and encode time for the frame, in seconds.
+            blocked (float): Time spent blocked writing it, in seconds.
+        """
+        # With backpressure control, time blocked on the terminal is its business, not processing
+        cost = busy if self.output_monitor is not None else busy + blocked
+        changed = self.quality is not None and self.quality.record(cost)
+        changed |= self.governor is not None and self.governor.record()
+        if changed:
+            self._apply_levels()
+
+    def _apply_levels(self):
+        """Applies the cheapest tier asked for by the quality, CPU and output controllers."""
+        levels = [self.quality.level if self.quality else 0,
+                  self.governor.level if self.governor else 0]
+        if self.output_monitor is not None:
+            self.encoding, level = self._encodings[self.output_monitor.level]
+            levels.append(level)
+        tier = self._tiers[max(levels)]
+        if tier != self.tier:
+            self.tier = tier
+            self.stats["quality_changes"] += 1
+
+    def _background(self, palette):
+        """Background variant of a palette for half-block rendering, built once per palette."""
+        background = self._backgrounds.get(palette.name)
+        if background is None:
+            background = self._backgrounds[palette.name] = palette.background()
+        return background
+
     def convert_frame_to_ascii(self, frame):
         """
         Core rendering pipeline: Resizes frame, calculates luminosity, and maps to ASCII.
+
+        Returns:
+            bytes: Encoded frame, ready to be written to the terminal.
         """
-        height, width, _ = frame.shape
-        aspect_ratio = height / width
-        
-        # Apply font aspect ratio correction (0.55)
-        new_height = int(aspect_ratio * self.width * 0.55)
-        
-        # High-quality resize (Downsampling)
-        resized_frame = cv2.resize(frame, (self.width, new_height))
-        
-        if self.color:
-            return self._convert_to_color(resized_frame)
+        return self.encode_grid(self.render_cells(frame), self.context)
+
+    def encode_grid(self, grid, ctx, stats=None):
+        """
+        Encodes a whole cell grid, one row per line, without cursor addressing.
+
+        Args:
+            grid (CellGrid): Rendered frame.
+            ctx (RenderContext): Context the grid was rendered with; provides the output buffer.
+            stats (Counter, optional): Receives color byte counters (defaults to the player's).
+
+        Returns:
+            bytes: Encoded frame.
+        """
+        stats = self.stats if stats is None else stats
+        if self.coalesce:
+            encoded = encode_cells(grid, row_end=grid.row_end)[:-1].tobytes()
         else:
-            return self._convert_to_mono(resized_frame)
+            encoded = self._encode_fixed(grid, ctx)
+        
+        # Track output size against the one-sequence-per-cell encoding
+        if grid.layers:
+            stats["color_frames"] += 1
+            stats["color_bytes"] += len(encoded)
+            stats["color_bytes_per_cell"] += grid.fixed_frame_size()
+        return encoded
+
+    def render_cells(self, frame, ctx=None):
+        """
+        Renders a frame to a terminal cell grid in the active mode, before encoding.
+
+        The grid's arrays belong to the render context and are overwritten by the
+        next frame rendered with it.
+
+        Args:
+            frame (np.ndarray): Decoded BGR video frame.
+            ctx (RenderContext, optional): Context to render with (defaults to the player's).
+
+        Returns:
+            CellGrid: Glyph bytes and color layers of the frame.
+        """
+        ctx = ctx or self._context_for(frame)
+        ctx.begin_frame()
+        if self.mode == "halfblock":
+            return self._halfblock_cells(ctx, ctx.resize(frame, rows_per_cell=2))
+        if self.mode == "braille":
+            return self._braille_cells(ctx, frame)
+        return self._ascii_cells(ctx, ctx.resize(frame))
+
+    def render_frame(self, frame):
+        """
+        Renders a video frame to the complete byte sequence written to the terminal.
+
+        With damage tracking enabled only the cells that changed since the previous
+        frame are sent; otherwise the whole frame is redrawn from the home position.
+        """
+        return self.encode_frame(self.render_cells(frame), self.context)
+
+    def encode_frame(self, grid, ctx, stats=None):
+        """
+        Encodes a rendered grid to the complete byte sequence written to the terminal.
+
+        Delta encoding compares against the previous frame, so frames must be passed
+        in display order.
+        """
+        stats = self.stats if stats is None else stats
+        encoding = self.encoding
+        if encoding != "off":
+            # A different quality tier makes the displayed grid meaningless to diff against
+            if (ctx.tier, encoding) != self._encoded_as:
+                if encoding not in self._trackers:
+                    self._trackers[encoding] = DamageTracker(self.damage.refresh_interval)
+                self.damage = self._trackers[encoding]
+                self.damage.reset()
+                self._encoded_as = (ctx.tier, encoding)
+            return self.damage.encode(grid, stats=stats)
+        self._encoded_as = None
+        return CURSOR_HOME + self.encode_grid(grid, ctx, stats)
 
-    def _convert_to_mono(self, frame):
-        """Grayscale optimized rendering."""
-        grayscale_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    def _glyph_indices(self, ctx, frame):
+        """Maps BGR pixel luminance to indices into the ASCII charset."""
+        h, w, _ = frame.shape
+        grayscale_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=ctx.array("gray", (h, w)))
+        levels = len(self.ascii_chars) - 1
         
         # Vectorized Numpy Operation: Map 0-255 pixel values to index in ASCII string
         # This approach is 100x faster than standard Python list iteration.
-        indices = (grayscale_frame.astype(int) * (len(self.ascii_chars) - 1)) // 255
+        scaled = ctx.array("scaled", (h, w), np.uint16)
+        np.multiply(grayscale_frame, np.uint16(levels), out=scaled)
+        if self.dither_matrix is not None:
+            # Ordered dither: floor(x + t) with t in [0, 1) of a charset step, i.e. (x * 255 + T) // 255
+            np.add(scaled, ctx.dither_tile(self.dither_matrix, h, w, 255, dtype=np.uint16), out=scaled)
+        np.floor_divide(scaled, 255, out=scaled)
+        if self.dither_matrix is not None:
+            np.minimum(scaled, levels, out=scaled)
+        return scaled
+
+    def _frame_rgb(self, ctx, frame, name="rgb"):
+        """Returns the (optionally quantized) RGB view of a resized BGR frame."""
+        # OpenCV frames are BGR; the SGR sequence expects R;G;B
+        rgb = frame[:, :, ::-1]
+        if self.quantize:
+            mask = np.uint8((0xFF << self.quantize) & 0xFF)
+            rgb = np.bitwise_and(rgb, mask, out=ctx.array(f"{name}_quantized", rgb.shape))
+        return rgb
+
+    def _dithered_rgb(self, ctx, rgb, palette, name="rgb"):
+        """Adds ordered-dither offsets of about one palette step before a coarse palette's LUT."""
+        if self.dither_matrix is None or not palette.dither_spread:
+            return rgb
+        spread = palette.dither_spread
+        tile = ctx.dither_tile(self.dither_matrix, rgb.shape[0], rgb.shape[1], spread, -spread // 2)
+        work = ctx.array(f"{name}_dither_work", rgb.shape, np.int16)
+        np.add(rgb, tile[:, :, None], out=work)
+        np.clip(work, 0, 255, out=work)
+        dithered = ctx.array(f"{name}_dithered", rgb.shape)
+        np.copyto(dithered, work, casting="unsafe")
+        return dithered
+
+    def _ascii_cells(self, ctx, frame):
+        """Charset rendering: one glyph per pixel, optionally colored with the pixel's color."""
+        h, w, _ = frame.shape
+        glyphs = ctx.array("glyphs", (h, w, 1))
+        np.take(self.glyph_lut, self._glyph_indices(ctx, frame), out=glyphs[:, :, 0], mode="clip")
+        palette = ctx.palette
+        if palette is None:
+            return CellGrid(glyphs)
+        rgb = self._dithered_rgb(ctx, self._frame_rgb(ctx, frame), palette)
+        return CellGrid(glyphs, [SgrLayer(palette, palette.values(rgb, ctx))])
+
+    def _halfblock_cells(self, ctx, frame):
+        """
+        Half-block rendering: every cell is an upper half block whose foreground is
+        the top pixel and whose background is the bottom pixel of a vertical pair,
+        doubling vertical resolution at the same character count.
+        """
+        palette = ctx.palette
+        background = self._background(palette)
+        rgb = self._dithered_rgb(ctx, self._frame_rgb(ctx, frame), palette)
+        h, w = rgb.shape[0] // 2, rgb.shape[1]
+        glyphs = np.broadcast_to(UPPER_HALF_BLOCK, (h, w, len(UPPER_HALF_BLOCK)))
+        return CellGrid(glyphs, [
+            SgrLayer(palette, palette.values(rgb[0::2], ctx, "fg_values")),
+            SgrLayer(background, background.values(rgb[1::2], ctx, "bg_values")),
+        ])
+
+    def _braille_cells(self, ctx, frame):
+        """
+        Braille rendering: every cell packs a thresholded 2x4 pixel block into one
+        of the U+2800 dot patterns, for 8 subpixels per character.
+
+        Bits are combined with vectorized shifts and ORs over strided views of the
+        (4H, 2W) bitmap and emitted as fixed 3-byte UTF-8, so there is no per-cell
+        Python code. In color mode each cell takes the average color of its block.
+        """
+        pixels = ctx.resize(frame, rows_per_cell=4, cols_per_cell=2)
+        grayscale = cv2.cvtColor(pixels, cv2.COLOR_BGR2GRAY, dst=ctx.array("gray", pixels.shape[:2]))
+        lit = ctx.array("lit", grayscale.shape, np.bool_)
+        if self.dither_matrix is None:
+            np.greater_equal(grayscale, 128, out=lit)
+        else:
+            np.greater(grayscale, ctx.dither_tile(self.dither_matrix, *grayscale.shape, 255), out=lit)
+        lit = lit.view(np.uint8)
+        h, w = ctx.height, ctx.width
         
-        ascii_frame = []
-        for row in indices:
-            ascii_frame.append("".join([self.ascii_chars[i] for i in row]))
+        bits = ctx.array("bits", (h, w))
+        shifted = ctx.array("bits_shifted", (h, w))
+        bits.fill(0)
+        for bit, (dy, dx) in enumerate(BRAILLE_DOTS):
+            np.left_shift(lit[dy::4, dx::2], bit, out=shifted)
+            np.bitwise_or(bits, shifted, out=bits)
         
-        return "\n".join(ascii_frame)
+        # UTF-8 of U+2800 + bits: E2, A0 | bits >> 6, 80 | bits & 0x3F
+        glyphs = ctx.array("glyphs", (h, w, 3))
+        glyphs[:, :, 0] = 0xE2
+        np.right_shift(bits, 6, out=shifted)
+        np.bitwise_or(shifted, 0xA0, out=glyphs[:, :, 1])
+        np.bitwise_and(bits, 0x3F, out=shifted)
+        np.bitwise_or(shifted, 0x80, out=glyphs[:, :, 2])
+        palette = ctx.palette
+        if palette is None:
+            return CellGrid(glyphs)
+        
+        block_colors = cv2.resize(frame, (w, h), dst=ctx.array("block_colors", (h, w, 3)),
+                                  interpolation=cv2.INTER_AREA if ctx.interpolation is None else ctx.interpolation)
+        rgb = self._dithered_rgb(ctx, self._frame_rgb(ctx, block_colors), palette)
+        return CellGrid(glyphs, [SgrLayer(palette, palette.values(rgb, ctx))])
+
+    def _encode_fixed(self, grid, ctx):
+        """
+        Fixed-width encoding with one SGR sequence per layer in every cell.
 
-    def _convert_to_color(self, frame):
-        """TrueColor (24-bit RGB) ANSI rendering."""
-        grayscale_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        indices = (grayscale_frame.astype(int) * (len(self.ascii_chars) - 1)) // 255
+        Each cell is a zero-padded sequence such as \033[38;2;RRR;GGG;BBBm{CHAR}, so
+        the frame is filled by writing digit triplets from a lookup table into a
+        preallocated (H, W, N) buffer instead of formatting one string per cell.
+        Mono frames degenerate to an (H, W+1) buffer whose last column holds the line feeds.
+        """
+        h, w, glyph_len = grid.glyphs.shape
+        buf, cells = ctx.frame_buffer(h, w, grid.cell_template, grid.row_end)
         
-        ascii_frame = []
+        # Wide frames are filled in row bands, each writing its own slice of the buffer
+        def fill(start, stop):
+            pos = 0
+            for layer in grid.layers:
+                layer.palette.fill(cells[start:stop, :, pos:pos + layer.palette.width], layer.values[start:stop])
+                pos += layer.palette.width
+            cells[start:stop, :, pos:] = grid.glyphs[start:stop]
         
-        # Iterate over pixel matrix to construct ANSI escape sequences
-        # Format: \033[38;2;R;G;Bm{CHAR}
-        for y in range(frame.shape[0]):
-            line_parts = []
-            for x in range(frame.shape[1]):
-                char = self.ascii_chars[indices[y, x]]
-                b, g, r = frame[y, x]
-                line_parts.append(f"\033[38;2;{r};{g};{b}m{char}")
-            
-            line_parts.append("\033[0m") # Reset color at line break
-            ascii_frame.append("".join(line_parts))
-            
-        return "\n".join(ascii_frame)
+        ctx.striped(fill, h)
+        
+        # Drop the trailing line feed so the cursor never scrolls past the last row
+        return buf.reshape(-1)[:-1].tobytes()
 
     def play(self):
         """Main playback loop logic with frame synchronization."""
-        print("\033[?25l", end="") # Hiding cursor for immersion
+        print("\033[?25l", end="", flush=True) # Hiding cursor for immersion
+        
+        # Frames bypass sys.stdout from here on
+        if self.writer is None:
+            sync = self.sync == "on" or (self.sync == "auto" and query_synchronized_output())
+            self.writer = TerminalWriter(sync=sync, stats=self.stats)
         
         if not os.path.exists(self.video_path):
              print(f"Error: Video file not found: {self.video_path}")
              return
 
+        # A complete recording of this clip and output lets passes skip OpenCV entirely.
+        # A .pxs container is one already; it is played as is, whatever the settings.
+        recording = None
+        recording_tier = self._base_tier
+        if PxsReader.is_container(self.video_path):
+            recording = PxsReader(self.video_path, stats=self.stats)
+            recording_tier = None
+        elif self.disk_cache is not None and self.delta == "off":
+            key = self.disk_cache.key(self.video_path, self.output_params())
+            recording = self.disk_cache.open(key)
+        
+        pacer = None
         try:
             while True:
-                cap = cv2.VideoCapture(self.video_path)
+                cap = None
+                if recording is not None:
+                    fps = recording.fps
+                else:
+                    cap = cv2.VideoCapture(self.video_path)
+                    
+                    if not cap.isOpened():
+                        print(f"Error: Could not open video file {self.video_path}")
+                        break
+
+                    fps = cap.get(cv2.CAP_PROP_FPS)
+                    if fps == 0: fps = 30
                 
-                if not cap.isOpened():
-                    print(f"Error: Could not open video file {self.video_path}")
+                # One presentation clock for all loop passes, so loops don't drift
+                if pacer is None:
+                    # Under a CPU budget, waits sleep the whole way instead of spinning
+                    pacer = FramePacer(1.0 / (fps * self.speed), stats=self.stats,
+                                       spin=not self.cpu_budget)
+                if (self.adaptive or self.cpu_budget or self.backpressure) and self._tiers is None:
+                    self._tiers = self.quality_tiers()
+                if self.adaptive and self.quality is None:
+                    self.quality = QualityController(self._tiers, 1.0 / (fps * self.speed),
+                                                     describe=self.describe_tier)
+                if self.cpu_budget and self.governor is None:
+                    self.governor = CpuGovernor(self.cpu_budget, fps, levels=len(self._tiers))
+                if self.backpressure and self.output_monitor is None:
+                    self._encodings = self.encoding_levels()
+                    self._frame_interval = 1.0 / (fps * self.speed)
+                    self.output_monitor = OutputMonitor(len(self._encodings), describe=self.describe_encoding)
+                if recording is not None:
+                    first_frame = recording.seek(self.start)
+                    clip_length = recording.length
+                else:
+                    first_frame = int(round(self.start * fps))
+                    clip_length = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) # 0 if the container doesn't say
+                if clip_length > 0 and first_frame >= clip_length:
+                    print(f"Error: --start {self.start:g}s is past the end of the clip ({clip_length / fps:.1f}s)")
+                    if cap is not None:
+                        cap.release()
                     break
-
-                fps = cap.get(cv2.CAP_PROP_FPS)
-                if fps == 0: fps = 30
-                frame_delay = 1.0 / fps
-
-                while True:
-                    start_time = time.time()
-                    ret, frame = cap.read()
-                    if not ret:
-                        break # EOF
+                pacer.start_pass(first_frame)
+                presented = self.stats["pacer_frames"]
+                
+                # Replay what is recorded or cached, and decode only the frames missing from it
+                skip = self._frame_skipper(pacer, first_frame)
+                position = first_frame
+                cap_position = 0 # Next frame of the capture, once it is open
+                try:
+                    while True:
+                        length = None
+                        if recording is not None:
+                            position = self._play_cached(recording, recording_tier, pacer, skip, position)
+                            length = recording.length
+                        if self.loop_cache is not None and position != length:
+                            position = self._play_cached(self.loop_cache, self.loop_cache.tier, pacer, skip, position)
+                            length = self.loop_cache.length
+                        if position == length:
+                            break
                     
-                    ascii_art = self.convert_frame_to_ascii(frame)
+                        # A quality change interrupted a recording, or the loop cache has a hole
+                        if cap is None:
+                            cap = cv2.VideoCapture(self.video_path)
+                            if not cap.isOpened():
+                                print(f"Error: Could not open video file {self.video_path}")
+                                return
+                        if position != cap_position:
+                            cap.set(cv2.CAP_PROP_POS_FRAMES, position)
                     
-                    # Direct Cursor Addressing (0,0) for flicker-free update
-                    sys.stdout.write("\033[H" + ascii_art)
-                    sys.stdout.flush()
+                        # Fix the output geometry once per stream (kept across loop passes)
+                        source_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+                        source_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+                        ctx = self.context
+                        if source_width and source_height and (
+                                ctx is None or (ctx.source_width, ctx.source_height) != (source_width, source_height)):
+                            self.open_context(source_width, source_height)
+
+                        # The process backend decodes straight into shared memory slots
+                        renderer = None
+                        if self.backend == "processes" and self.workers > 0 and source_width and source_height:
+                            renderer = self.open_process_renderer(source_width, source_height)
                     
-                    # Frame Pacing: Sleep only if processing was faster than frame time
-                    processing_time = time.time() - start_time
-                    wait_time = frame_delay - processing_time
-                    if wait_time > 0:
-                        time.sleep(wait_time)
-                
-                cap.release()
+                        # Record complete passes of the clip into the disk cache
+                        if self.disk_cache is not None and self.delta == "off" and recording is None and position == 0:
+                            self.recorder = self.disk_cache.recorder(key, **self.container_settings(fps))
+                    
+                        # Decode ahead on a background thread while this one renders and writes,
+                        # up to the next frame the loop cache can play
+                        until = self._cached_frames(self.loop_cache) if self.loop_cache is not None else None
+                        if renderer is not None:
+                            reader = FrameReader(cap, depth=max(self.prefetch, 1), stats=self.stats,
+                                                 images=list(renderer.ring.frames), skip=skip, start=position,
+                                                 until=until)
+                        else:
+                            reader = FrameReader(cap, depth=self.prefetch, stats=self.stats, skip=skip,
+                                                 start=position, until=until)
+                        try:
+                            if self.workers > 0:
+                                self._play_pipelined(reader, pacer, renderer)
+                            else:
+                                self._play_inline(reader, pacer)
+                            if reader.stopped_at is not None:
+                                position = cap_position = reader.stopped_at
+                                continue
+                            if self.loop_cache is not None:
+                                self.loop_cache.length = reader.frame_count
+                            if self.recorder is not None:
+                                self.recorder.finish(reader.frame_count)
+                                if self.loop and self.loop_cache is None:
+                                    recording = self.disk_cache.open(key)
+                        finally:
+                            if self.recorder is not None:
+                                self.recorder.abandon()
+                                self.recorder = None
+                            reader.close()
+                        break
+                finally:
+                    if cap is not None:
+                        cap.release()
                 
-                if not self.loop:
+                # A pass that showed nothing would show nothing again, as fast as it can
+                if not self.loop or self.stats["pacer_frames"] == presented:
                     break
                     
         except KeyboardInterrupt:
             pass # Graceful exit on user interrupt
         finally:
+            if recording is not None:
+                recording.close()
+            if self._process_renderer is not None:
+                self._process_renderer.close()
+                self._process_renderer = None
             print("\033[?25h", end="") # Restore cursor
             print("\033[0m") # Reset colors
             print("\nPlayback finished.")
+            if self.show_stats:
+                self.report_stats()
+
+    def transcode(self, output_path):
+        """
+        Renders every frame of the video once into a .pxs container.
+
+        Playing the container later only writes the stored frames, so the
+        rendering cost is paid once instead of on every playback. With --delta
+        the container stores keyframes every --refresh frames and at scene cuts,
+        and only the changed cells in between.
+
+        Args:
+            output_path (str): Container file to write; replaced atomically when done.
+
+        Returns:
+            bool: True if the container was written.
+        """
+        cap = cv2.VideoCapture(self.video_path)
+        if not cap.isOpened():
+            print(f"Error: Could not open video file {self.video_path}")
+            return False
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.open_context(int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        
+        temp_path = f"{output_path}.{os.getpid()}.tmp"
+        reader = FrameReader(cap, depth=self.prefetch, stats=self.stats)
+        start = time.perf_counter()
+        try:
+            with open(temp_path, "wb") as f:
+                # Decompression cost doesn't depend on the level, so the one-off transcode can afford a higher one
+                writer = PxsWriter(f, level=6, stats=self.stats, **self.container_settings(fps))
+                while (frame := reader.read()) is not None:
+                    output = self.render_frame(frame)
+                    self.stats["frames"] += 1
+                    self.stats["bytes"] += len(output)
+                    keyframe = self.encoding == "off" or self.damage.keyframe
+                    self.stats["container_keyframes"] += keyframe
+                    writer.add(output, keyframe=keyframe)
+                    if writer.frames % 50 == 0:
+                        print(f"\r[System] Transcoded {writer.frames}/{total} frames", end="", flush=True)
+                writer.finish()
+            os.replace(temp_path, output_path)
+        finally:
+            reader.close()
+            cap.release()
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        
+        elapsed = time.perf_counter() - start
+        print(f"\r[System] Transcoded {writer.frames} frames in {elapsed:.1f}s "
+              f"({writer.frames / max(elapsed, 1e-9):.0f} fps) to {output_path}: "
+              f"{os.path.getsize(output_path) / (1 << 20):.1f} MB")
+        if self.encoding != "off":
+            print(f"[System] Keyframes: {self.stats['container_keyframes']} "
+                  f"({self.stats['damage_scene_cuts']} at scene cuts), "
+                  f"deltas: {writer.frames - self.stats['container_keyframes']}")
+        if writer.codec is not None:
+            dictionary = writer.codec.dictionary
+            print(f"[System] Compressed {self.stats['compress_in'] / max(self.stats['compress_out'], 1):.1f}x "
+                  + (f"against a {len(dictionary) / 1024:.0f} KB dictionary" if dictionary
+                     else "without a dictionary (clip too short to train one)"))
+        if self.show_stats:
+            self.report_stats()
+        return True
+
+    def _write_frame(self, output, tier=None, encoding=None):
+        """
+        Writes one encoded frame to the terminal and counts it.
+
+        Args:
+            output (bytes): Encoded frame.
+            tier (tuple, optional): Quality tier the frame was rendered at.
+            encoding (str, optional): Delta mode the frame was encoded with.
+
+        Returns:
+            float: Time spent writing, in seconds.
+        """
+        # A smaller tier leaves the previous picture's edges behind, so clear it first
+        if tier is not None and tier != self._shown_tier:
+            if self._shown_tier is not None:
+                output = CLEAR_SCREEN + output
+            self._shown_tier = tier
+        
+        self.stats["frames"] += 1
+        self.stats["bytes"] += len(output)
+        
+        # Frames carry their own cursor addressing (home or per-span jumps)
+        blocked = self.writer.write(output) if output else 0.0
+        
+        # Frames still in flight from before an encoding change say nothing about the new one
+        monitor = self.output_monitor
+        if monitor is not None and (tier, encoding) == (self.tier, self.encoding):
+            interval = self._frame_interval * (self.governor.stride if self.governor else 1)
+            if monitor.record(len(output), blocked, interval):
+                self._apply_levels()
+        return blocked
+
+    def _frame_skipper(self, pacer, first_frame):
+        """
+        Builds the decoder's skip test for one loop pass.
+
+        Frames before the start offset, frames between the ones shown at the
+        playback speed or the CPU governor's reduced frame rate, and frames that
+        would be presented too late are grabbed without being retrieved.
+        """
+        def skip(position, queued):
+            stride = self.speed * (self.governor.stride if self.governor else 1)
+            if position < first_frame or (position - first_frame) % stride:
+                return True
+            
+            return pacer.is_late(pacer.base + position, queued=queued)
+        return skip
+
+    def _cached_frames(self, cache):
+        """Builds the decoder's test for frames the loop cache can play at the current output."""
+        def cached(position):
+            return position in cache and (cache.tier, self.encoding) == (self.tier, "off")
+        return cached
+
+    def container_settings(self, fps):
+        """PxsWriter settings describing this player's output."""
+        width, palette, _ = self._base_tier
+        return dict(columns=width, rows=self.context.height if self.context else 0, fps=fps,
+                    mode=self.mode, palette=palette.name if palette else None, compress=self.cache_compress)
+
+    def output_params(self):
+        """Every setting that shapes the encoded output, as the render cache keys it."""
+        width, palette, _ = self._base_tier
+        return {"version": 1, "width": width, "mode": self.mode, "palette": palette.name if palette else None,
+                "charset": self.ascii_chars, "dither": self.dither, "quantize": self.quantize,
+                "coalesce": self.coalesce}
+
+    def _play_cached(self, cache, tier, pacer, skip, position):
+        """
+        Plays the run of stored frames starting at `position`, while the output matches them.
+
+        Frames the skip test passes over don't need to be stored, so the run only
+        ends at a frame that is both due and missing.
+
+        Args:
+            cache (LoopCache | PxsReader): Frames by number in the source.
+            tier (tuple): Quality tier the frames were rendered at; None plays them whatever
+                the current tier.
+            pacer (FramePacer): Presentation clock.
+            skip (callable): The pass's frame skip test.
+            position (int): First frame to play.
+
+        Returns:
+            int: Number of the first frame that has to be decoded.
+        """
+        shown = None
+        while tier is None or (tier, self.encoding) == (self.tier, "off"):
+            if position not in cache:
+                # Only frames within the clip can be skipped without decoding
+                if cache.length is None or position >= cache.length or not skip(position, 0):
+                    break
+            elif not skip(position, 0):
+                index = pacer.next_frame(position)
+                
+                # Delta frames need every frame since the last one shown (or a keyframe)
+                chain = cache.chain(position, shown)
+                if len(chain) == 1:
+                    output = cache.get(position)
+                else:
+                    output = b"".join(cache.get(frame) for frame in chain)
+                    self.stats["container_replayed"] += len(chain) - 1
+                pacer.wait(index)
+                shown = position
+                self._write_frame(output, self.tier, self.encoding)
+                
+                # Nothing is rendered, so only the CPU governor has anything to measure
+                if self.governor is not None and self.governor.record():
+                    self._apply_levels()
+            position += 1
+        return position
+
+    def _remember(self, position, output, tier, encoding):
+        """Adds a written frame to the loop cache and the render cache recording, if any."""
+        if self.recorder is not None:
+            # The entry is keyed by the configured output, so any other tier ends the recording
+            if (tier, encoding) == (self._base_tier, "off"):
+                self.recorder.add(position, output)
+            else:
+                self.recorder.abandon()
+        if self.loop_cache is not None and encoding == "off":
+            self.loop_cache.store(position, output, tier)
+
+    def _play_inline(self, reader, pacer):
+        """Plays one pass of a stream, rendering and writing every frame on this thread."""
+        while True:
+            frame = reader.read()
+            if frame is None:
+                break # EOF
+            
+            # Frame Pacing: skip frames we can no longer show on time, hold the rest until due
+            index = pacer.next_frame(reader.position)
+            if pacer.is_late(index, newer=reader.available > 0):
+                continue
+            start = time.perf_counter()
+            output = self.render_frame(frame)
+            busy = time.perf_counter() - start
+            pacer.wait(index)
+            self._record_cost(busy, self._write_frame(output, self.context.tier, self.encoding))
+            self._remember(reader.position, output, self.context.tier, self.encoding)
+
+    def open_process_renderer(self, source_width, source_height):
+        """
+        Returns the process pool backend for a stream geometry, starting it if needed.
+
+        The shared ring has a slot for every frame that can be in flight: queued
+        for rendering, being decoded, or held by a pipeline worker.
+        """
+        frame_shape = (source_height, source_width, 3)
+        renderer = self._process_renderer
+        if renderer is not None and renderer.ring.frame_shape == frame_shape:
+            return renderer
+        if renderer is not None:
+            renderer.close()
+        
+        # Size the output slots for the fixed-width encoding, which no other encoding exceeds
+        probe = self.render_cells(np.zeros(frame_shape, dtype=np.uint8),
+                                  self._new_context(source_width, source_height))
+        output_size = len(CURSOR_HOME) + probe.fixed_frame_size()
+        slots = max(self.prefetch, 1) + 2 + 3 * self.workers
+        ring = SharedFrameRing(slots, frame_shape, output_size)
+        
+        options = dict(video_path=self.video_path, width=self.width, color=self.color,
+                       colors=self.palette.name if self.palette else None, coalesce=self.coalesce,
+                       quantize=self.quantize, mode=self.mode, dither=self.dither,
+                       prefetch=0, workers=0, threads=1)
+        self._process_renderer = ProcessRenderer(options, self.workers, ring, stats=self.stats)
+        return self._process_renderer
+
+    def _play_pipelined(self, reader, pacer, renderer=None):
+        """
+        Plays one pass of a stream through a decode -> render -> encode -> write pipeline.
+
+        Render and encode stages run on `self.workers` threads each. Every frame in
+        flight is rendered into its own render context, taken from a pool of slots
+        and returned once the frame is encoded, so concurrent frames never share
+        scratch buffers. Delta encoding compares against the previous frame and is
+        therefore run as an ordered stage on a single thread; so is encoding under
+        backpressure control, which may switch delta encoding on mid-stream.
+
+        With a process renderer, a single stage of `self.workers` threads hands
+        each frame's ring slot to a worker process that renders and encodes it.
+
+        Late frames are dropped as they enter the pipeline, before any rendering
+        or delta encoding, so the terminal never misses a frame it was encoded against.
+        """
+        pipeline = Pipeline(stats=self.stats)
+        slot_count = 2 * self.workers + 2
+        free = queue.Queue()
+        for ctx in self._slots:
+            free.put(ctx)
+
+        def frames():
+            while (frame := reader.take()) is not None:
+                index = pacer.next_frame(reader.position)
+                if pacer.is_late(index, newer=reader.available > 0):
+                    reader.release(frame)
+                    continue
+                if renderer is not None:
+                    yield index, frame
+                    continue
+                if free.empty() and len(self._slots) < slot_count:
+                    ctx = self._new_context(frame.shape[1], frame.shape[0], stats=Counter())
+                    self._slots.append(ctx)
+                else:
+                    ctx = pipeline.get(free)
+                    if ctx.tier != self.tier:
+                        # The quality tier changed: retire this slot's context, keep its counters
+                        retired = ctx
+                        ctx = self._new_context(frame.shape[1], frame.shape[0], stats=retired.stats)
+                        self._slots[self._slots.index(retired)] = ctx
+                yield index, frame, ctx
+
+        def render(job):
+            index, frame, ctx = job
+            start = time.perf_counter()
+            grid = self.render_cells(frame, ctx)
+            reader.release(frame)
+            return index, grid, ctx, time.perf_counter() - start
+
+        def encode(job):
+            index, grid, ctx, busy = job
+            start = time.perf_counter()
+            encoding = self.encoding
+            output = self.encode_frame(grid, ctx, ctx.stats)
+            tier = ctx.tier
+            free.put(ctx)
+            return index, output, tier, encoding, busy + time.perf_counter() - start
+
+        def write(job):
+            # Frame Pacing: frames arrive ready, so hold each one until it is due
+            index, output, tier, encoding, busy = job
+            if self.output_monitor is not None and (tier, encoding) != (self.tier, self.encoding):
+                # Encoded before the output got cheaper; the next current frame redraws in full
+                pacer.drop(index)
+                return
+            pacer.wait(index)
+            
+            # Stage work is spread over the workers; writing is serial
+            self._record_cost(busy / self.workers, self._write_frame(output, tier, encoding))
+            self._remember(index - pacer.base, output, tier, encoding)
+
+        def render_in_process(job):
+            index, frame = job
+            start = time.perf_counter()
+            output = renderer.render_frame(frame)
+            reader.release(frame)
+            return index, output, self.tier, self.encoding, time.perf_counter() - start
+
+        if renderer is not None:
+            pipeline.stage("render", render_in_process, workers=self.workers)
+        else:
+            pipeline.stage("render", render, workers=self.workers)
+            pipeline.stage("encode", encode, workers=self.workers, ordered=self.delta != "off" or self.backpressure)
+        try:
+            pipeline.run(frames(), write)
+        finally:
+            # Slot contexts keep their own counters so workers never share one
+            for ctx in self._slots:
+                self.stats.update(ctx.stats)
+                ctx.stats.clear()
+
+    def report_stats(self):
+        """Prints a summary of the rendering statistics collected during playback."""
+        frames = self.stats["frames"]
+        if not frames:
+            return
+        print(f"[Stats] Frames rendered: {frames}")
+        print(f"[Stats] Avg bytes/frame: {self.stats['bytes'] / frames:.0f}")
+        steady = self.stats["scratch_allocations_steady"]
+        print(f"[Stats] Scratch allocations: {self.stats['scratch_allocations'] - steady} at setup, "
+              f"{steady} during playback ({steady / frames:.2f}/frame)")
+        
+        reads = self.stats["prefetch_reads"]
+        if reads:
+            print(f"[Stats] Decode queue: {self.stats['prefetch_occupancy'] / reads:.1f}/{self.prefetch} frames ready on average | "
+                  f"Stalls: {self.stats['prefetch_stalls']} ({1000 * self.stats['prefetch_stall_time'] / reads:.2f} ms/frame) | "
+                  f"Queue full: {self.stats['prefetch_full']}")
+        
+        if self.stats["pipeline_render_items"]:
+            timings = " | ".join(f"{name} {1000 * self.stats[f'pipeline_{name}_time'] / frames:.2f} ms"
+                                 for name in ("render", "encode") if self.stats[f"pipeline_{name}_items"])
+            print(f"[Stats] Pipeline ({self.workers} {self.backend}/stage): {timings} | "
+                  f"write {1000 * self.stats['writer_blocked_time'] / frames:.2f} ms per frame | "
+                  f"Reordered: {self.stats['pipeline_reordered']}")
+        
+        writes = self.stats["writer_calls"] - self.stats["writer_short_writes"]
+        if writes:
+            print(f"[Stats] Terminal writes: {self.stats['writer_bytes'] / writes:.0f} bytes/frame | "
+                  f"{self.stats['writer_calls'] / writes:.2f} syscalls/frame | "
+                  f"Blocked: {1000 * self.stats['writer_blocked_time'] / writes:.2f} ms avg / "
+                  f"{1000 * self.stats['writer_blocked_max']:.2f} ms max | "
+                  f"Synchronized output: {'on' if self.writer.sync else 'off'}")
+        
+        shown = self.stats["pacer_frames"]
+        if shown:
+            dropped = self.stats["pacer_dropped"]
+            print(f"[Stats] Pacing: {self.stats['pacer_lag_ns'] / shown / 1e6:.3f} ms avg / "
+                  f"{self.stats['pacer_lag_max_ns'] / 1e6:.3f} ms max behind deadline | "
+                  f"Dropped: {dropped} ({100 * dropped / (shown + dropped):.1f}%)")
+        
+        skipped = self.stats["decode_skipped"]
+        if skipped:
+            grab = self.stats["decode_grab_time"] / self.stats["decode_grabs"]
+            retrieve = self.stats["decode_retrieve_time"] / max(self.stats["decode_retrieves"], 1)
+            print(f"[Stats] Skipped {skipped} frames with grab(): {1000 * grab:.2f} ms each "
+                  f"vs {1000 * (grab + retrieve):.2f} ms for a full read")
+        
+        if self._tiers is not None:
+            print(f"[Stats] Quality: {self.stats['quality_changes']} tier changes, "
+                  f"ended at {self.describe_tier(self.tier)}")
+        
+        if self.disk_cache is not None:
+            print(f"[Stats] Render cache: {self.stats['disk_cache_hits']} hits / {self.stats['disk_cache_misses']} misses | "
+                  f"{self.stats['disk_cache_stored']} stored, {self.stats['disk_cache_evicted']} evicted | "
+                  f"{self.disk_cache.directory}")
+        
+        if self.stats["compress_in"] or self.stats["decompress_frames"]:
+            ratio = (f"{self.stats['compress_in'] / self.stats['compress_out']:.1f}x "
+                     f"({self.stats['compress_in'] / (1 << 20):.1f} MB in)") if self.stats["compress_in"] else "none"
+            decompress = self.stats["decompress_time"] / max(self.stats["decompress_frames"], 1)
+            print(f"[Stats] Compression: {ratio} | "
+                  f"Decompress: {1000 * decompress:.3f} ms/frame over {self.stats['decompress_frames']} frames")
+        
+        if self.stats["container_replayed"]:
+            print(f"[Stats] Container seeks: replayed {self.stats['container_replayed']} delta frames "
+                  f"to reach frames away from a keyframe")
+        
+        cache = self.loop_cache
+        if cache is not None and (self.stats["cache_hits"] or self.stats["cache_misses"]):
+            ratio = f" ({cache.size / cache.resident:.1f}x compressed)" if cache.compress and cache.resident else ""
+            coverage = f"{len(cache.frames)}/{cache.length}" if cache.length else f"{len(cache.frames)}"
+            print(f"[Stats] Loop cache: {self.stats['cache_hits']} hits / {self.stats['cache_misses']} misses | "
+                  f"{coverage} frames, {cache.resident / (1 << 20):.1f} MB resident{ratio} | "
+                  f"Limit: {cache.limit / (1 << 20):.0f} MB{' (full)' if cache.full else ''}")
+        
+        monitor = self.output_monitor
+        if monitor is not None:
+            throughput = f"~{monitor.throughput / 1000:.0f} KB/s" if monitor.throughput else "not limiting"
+            budget = f"{monitor.budget:.0f} bytes/frame" if monitor.budget else "none"
+            print(f"[Stats] Terminal throughput: {throughput} | Byte budget: {budget} | "
+                  f"Encoding changes: {monitor.changes}, ended at {self.describe_encoding(monitor.level)}")
+        
+        governor = self.governor
+        if governor is not None and governor.usage is not None:
+            print(f"[Stats] CPU: {100 * governor.usage:.1f}% of one core in the last window "
+                  f"(budget {100 * governor.budget:.0f}%) | Showing {governor.fps / governor.stride:.1f} fps | "
+                  f"Adjustments: {governor.changes}")
+        
+        color_frames = self.stats["color_frames"]
+        if color_frames:
+            actual = self.stats["color_bytes"] / color_frames
+            per_cell = self.stats["color_bytes_per_cell"] / color_frames
+            print(f"[Stats] Color bytes/frame: {actual:.0f} "
+                  f"(per-cell encoding: {per_cell:.0f}, saved {100 * (1 - actual / per_cell):.1f}%)")
+        
+        if self.stats["damage_cells"]:
+            changed = 100 * self.stats["damage_cells_changed"] / self.stats["damage_cells"]
+            print(f"[Stats] Changed cells: {changed:.1f}% | Full redraws: {self.stats['damage_full_frames']}")
+        
+        if self.stats["rows"]:
+            delta_frames = frames - self.stats["damage_full_frames"]
+            print(f"[Stats] Rows skipped/frame: {self.stats['rows_skipped'] / max(delta_frames, 1):.1f} "
+                  f"({100 * self.stats['rows_skipped'] / self.stats['rows']:.1f}%) | "
+                  f"Full redraws: {self.stats['damage_full_frames']}")
 
 def download_youtube_video(url):
     """
@@ -245,12 +3646,65 @@ def download_youtube_video(url):
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="PixelStream Bot - Terminal Video Player")
-    parser.add_argument("input", help="Path to the video file or YouTube URL")
+    parser.add_argument("input", help="Path to the video file, .pxs container or YouTube URL")
     parser.add_argument("--width", type=int, default=None, help="Output width in characters (default: Auto-fit)")
     parser.add_argument("--color", action="store_true", help="Enable TrueColor mode")
+    parser.add_argument("--colors", choices=["truecolor", "256", "16"], default=None,
+                        help="Color depth for terminals without TrueColor support (implies --color)")
     parser.add_argument("--loop", action="store_true", help="Loop the video indefinitely")
+    parser.add_argument("--mode", choices=["ascii", "halfblock", "braille"], default="ascii",
+                        help="Cell renderer: charset glyphs, colored half blocks (2x vertical resolution) "
+                             "or braille dots (2x4 subpixels per cell)")
+    parser.add_argument("--dither", choices=["none", "bayer", "bluenoise"], default="none",
+                        help="Ordered dithering before charset, braille and 16/256-color quantization")
+    parser.add_argument("--coalesce", action="store_true", help="Emit one color code per run of equal colors")
+    parser.add_argument("--quantize", type=int, default=0, choices=range(8), metavar="BITS",
+                        help="Drop low bits per color channel to lengthen color runs (0-7)")
+    parser.add_argument("--delta", choices=["off", "rows", "cells"], default="off",
+                        help="Redraw only what changed since the previous frame (default: off)")
+    parser.add_argument("--refresh", type=int, default=300, metavar="FRAMES",
+                        help="In delta mode, force a full redraw every N frames; also the keyframe interval of transcoded containers (0 = never)")
+    parser.add_argument("--prefetch", type=int, default=4, metavar="FRAMES",
+                        help="Decode up to N frames ahead on a background thread (0 = decode inline)")
+    parser.add_argument("--workers", type=int, default=1, metavar="N",
+                        help="Threads per render/encode pipeline stage (0 = single-threaded playback loop)")
+    parser.add_argument("--backend", choices=["threads", "processes"], default="threads",
+                        help="Run pipeline workers as threads or as processes fed through shared memory")
+    parser.add_argument("--speed", type=int, default=1, metavar="FACTOR",
+                        help="Playback speed factor, e.g. 2, 4 or 8 (skipped frames are not decoded to BGR)")
+    parser.add_argument("--start", type=float, default=0.0, metavar="SECONDS",
+                        help="Start playback at this offset")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="Lower width, color depth and resize quality while rendering can't keep up")
+    parser.add_argument("--cpu-budget", type=float, default=None, metavar="PERCENT",
+                        help="Keep CPU usage under this percentage of one core by lowering fps, then quality")
+    parser.add_argument("--sync", choices=["auto", "on", "off"], default="auto",
+                        help="Wrap frames in synchronized-update markers (DEC mode 2026); auto asks the terminal")
+    parser.add_argument("--backpressure", action="store_true",
+                        help="Send cheaper frames (delta, then lower quality) when the terminal can't keep up")
+    parser.add_argument("--cache-mb", type=int, default=256, metavar="MB",
+                        help="With --loop, memory for replaying encoded frames instead of re-rendering (0 disables)")
+    parser.add_argument("--cache-compress", action="store_true",
+                        help="zlib-compress cached and transcoded frames against a dictionary trained on the clip")
+    parser.add_argument("--cache-dir", default=None, metavar="DIR",
+                        help="Keep complete renders in this directory and replay them without decoding")
+    parser.add_argument("--cache-dir-mb", type=int, default=1024, metavar="MB",
+                        help="Size limit of --cache-dir; least recently played renders are evicted first")
+    parser.add_argument("--log", default=None, metavar="FILE",
+                        help="Append diagnostics such as adaptive quality changes to this file")
+    parser.add_argument("--threads", type=int, default=None, metavar="N",
+                        help="Threads for row-striped color lookup and encoding (default: CPU count)")
+    parser.add_argument("--stats", action="store_true", help="Print rendering statistics on exit")
     
-    args = parser.parse_args()
+    # "transcode INPUT OUTPUT [options]" renders into a .pxs container instead of playing
+    transcode = sys.argv[1:2] == ["transcode"]
+    if transcode:
+        parser.prog += " transcode"
+        parser.add_argument("output", help="Container file to write (.pxs)")
+    args = parser.parse_args(sys.argv[2:] if transcode else None)
+    if args.log:
+        logging.basicConfig(filename=args.log, level=logging.INFO,
+                            format="%(asctime)s %(name)s %(levelname)s %(message)s")
 
     print("\n" + "="*40)
     print("   PixelStream Bot | @AshrafMorningstar   ")
@@ -263,9 +3717,20 @@ if __name__ == "__main__":
     if args.input.startswith("http://") or args.input.startswith("https://"):
         video_path = download_youtube_video(args.input)
 
-    bot = PixelStreamBot(video_path, width=args.width, color=args.color, loop=args.loop)
+    bot = PixelStreamBot(video_path, width=args.width, color=args.color, loop=args.loop, colors=args.colors,
+                         coalesce=args.coalesce, quantize=args.quantize, show_stats=args.stats,
+                         delta=args.delta, refresh_interval=args.refresh, mode=args.mode,
+                         dither=args.dither, prefetch=args.prefetch, workers=args.workers, threads=args.threads, backend=args.backend,
+                         speed=args.speed, start=args.start, adaptive=args.adaptive,
+                         cpu_budget=args.cpu_budget / 100 if args.cpu_budget else None, sync=args.sync,
+                         backpressure=args.backpressure, cache_limit=args.cache_mb << 20,
+                         cache_compress=args.cache_compress, cache_dir=args.cache_dir,
+                         cache_dir_limit=args.cache_dir_mb << 20)
     try:
-        bot.play()
+        if transcode:
+            bot.transcode(args.output)
+        else:
+            bot.play()
     except Exception as e:
         print(f"An error occurred: {e}")
         # Emergency cursor restore
@@ -0,0 +1,134 @@
+"""
+PixelStream Bot - High-Performance Terminal Media Engine.
+
+This module is part of the PixelStream architecture, designed for real-time
+ASCII rendering and stream processing with TrueColor support.
+Optimized for efficiency and low-latency execution during video playback.
+"""
+'''
+© 2026 * These are personal recreations of existing projects, developed by Ashraf Morningstar for learning and skill development.
+Original project concepts remain the intellectual property of their respective creators.
+
+https://github.com/AshrafMorningstar
+Copyright (c) 2026
+'''
+
+# Round-trip and backward-compatibility checks for the .pxs frame container.
+# Run with: python -m unittest test_container
+
+import os
+import tempfile
+import unittest
+import zlib
+
+import numpy as np
+
+from main import (PXS_COMPRESSED, PXS_HEADER, PXS_INDEX, PXS_INDEX_V1, PXS_KEYFRAME, PXS_MAGIC,
+                  PxsReader, PxsWriter)
+
+
+def sample_frames(count):
+    """Distinct ANSI-looking frames, long enough to be worth compressing."""
+    return [b"\033[H" + b"".join(b"\033[38;2;%d;%d;%dm#" % (i, j, (i * j) % 256) for j in range(200))
+            for i in range(count)]
+
+
+class ContainerTest(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._dir.name, "clip.pxs")
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def write(self, frames, keyframes=None, **settings):
+        """Writes `frames` with PxsWriter and returns a reader for the result."""
+        with open(self.path, "wb") as f:
+            writer = PxsWriter(f, columns=80, rows=24, fps=30, mode="ascii", palette="truecolor", **settings)
+            for position, output in enumerate(frames):
+                writer.add(output, keyframe=True if keyframes is None else position in keyframes)
+            writer.finish()
+        reader = PxsReader(self.path)
+        self.addCleanup(reader.close)
+        return reader
+
+    def write_legacy(self, frames, version, compress=False):
+        """Writes `frames` the way version 1 and 2 containers were laid out."""
+        dtype = PXS_INDEX_V1 if version == 1 else PXS_INDEX
+        data = [zlib.compress(output, 1) if compress else output for output in frames]
+        offsets = PXS_HEADER.size + np.cumsum([0] + [len(d) for d in data[:-1]])
+        index = np.zeros(len(frames), dtype=dtype)
+        index["offset"] = offsets
+        index["size"] = [len(d) for d in data]
+        index["time_us"] = [round(i * 1e6 / 30) for i in range(len(frames))]
+        if version > 1:
+            index["flags"] = PXS_KEYFRAME
+        with open(self.path, "wb") as f:
+            f.write(PXS_HEADER.pack(PXS_MAGIC, version, PXS_COMPRESSED if compress else 0, 80, 24, 30.0,
+                                    len(frames), PXS_HEADER.size + sum(map(len, data)), b"ascii", b""))
+            f.write(b"".join(data))
+            f.write(index.tobytes())
+        reader = PxsReader(self.path)
+        self.addCleanup(reader.close)
+        return reader
+
+    def assertFrames(self, reader, frames):
+        self.assertEqual(reader.length, len(frames))
+        self.assertEqual([bytes(reader.get(i)) for i in range(reader.length)], frames)
+
+    def test_round_trip(self):
+        frames = sample_frames(10)
+        reader = self.write(frames)
+        self.assertFrames(reader, frames)
+        self.assertEqual((reader.columns, reader.rows, reader.fps), (80, 24, 30))
+        self.assertEqual((reader.mode, reader.palette), ("ascii", "truecolor"))
+        self.assertIsNone(reader.codec)
+
+    def test_compressed_round_trip(self):
+        # Shorter than the dictionary's training sample, and well past it
+        for count in (1, 5, 80):
+            with self.subTest(frames=count):
+                frames = sample_frames(count)
+                reader = self.write(frames, compress=True)
+                self.assertFrames(reader, frames)
+                # A dictionary is only trained once the clip fills the sample
+                self.assertEqual(reader.codec.dictionary is not None, count >= 32)
+                self.assertLess(os.path.getsize(self.path), sum(map(len, frames)))
+
+    def test_delta_chain(self):
+        frames = sample_frames(12)
+        reader = self.write(frames, keyframes={0, 5, 9}, compress=True)
+        self.assertFrames(reader, frames)
+        self.assertEqual(list(reader.keyframes), [0, 5, 9])
+        self.assertEqual(list(reader.chain(7)), [5, 6, 7])
+        self.assertEqual(list(reader.chain(7, shown=6)), [7])
+        self.assertEqual(list(reader.chain(7, shown=3)), [5, 6, 7])
+        self.assertEqual(list(reader.chain(9, shown=8)), [9])
+
+    def test_seek(self):
+        reader = self.write(sample_frames(90))
+        self.assertEqual(reader.seek(0), 0)
+        self.assertEqual(reader.seek(1.0), 30)
+        self.assertEqual(reader.seek(10.0), 90)
+
+    def test_legacy_versions(self):
+        frames = sample_frames(6)
+        for version in (1, 2):
+            for compress in (False, True):
+                with self.subTest(version=version, compress=compress):
+                    reader = self.write_legacy(frames, version, compress)
+                    self.assertFrames(reader, frames)
+                    self.assertEqual(list(reader.keyframes), list(range(6)))
+
+    def test_incomplete_file(self):
+        self.write(sample_frames(4), compress=True)
+        with open(self.path, "r+b") as f:
+            f.truncate(os.path.getsize(self.path) - 1)
+        with self.assertRaises(ValueError):
+            PxsReader(self.path)
+        os.remove(self.path) # Nothing left mapped
+
+
+if __name__ == "__main__":
+    unittest.main()
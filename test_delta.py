@@ -0,0 +1,188 @@
+"""
+PixelStream Bot - High-Performance Terminal Media Engine.
+
+This module is part of the PixelStream architecture, designed for real-time
+ASCII rendering and stream processing with TrueColor support.
+Optimized for efficiency and low-latency execution during video playback.
+"""
+'''
+© 2026 * These are personal recreations of existing projects, developed by Ashraf Morningstar for learning and skill development.
+Original project concepts remain the intellectual property of their respective creators.
+
+https://github.com/AshrafMorningstar
+Copyright (c) 2026
+'''
+
+# Screen-equality checks for the cell and row delta encoders.
+# Run with: python -m unittest test_delta
+
+import re
+import unittest
+from collections import Counter
+
+import numpy as np
+
+from main import (CURSOR_HOME, TRUECOLOR, CellGrid, DamageTracker, PixelStreamBot, RowTracker, SgrLayer,
+                  encode_full_frame)
+
+TOKEN = re.compile(r"\033\[(?:(\d+);(\d+))?H|\033\[([\d;]*)m|(\n)|(.)", re.S)
+JUMP = re.compile(rb"\033\[\d{3};\d{3}H")
+
+
+class Screen:
+    """Minimal terminal model: cursor moves, SGR colors, line feeds and glyphs."""
+
+    def __init__(self, rows, columns):
+        self.cells = [[None] * columns for _ in range(rows)]
+        self.y = self.x = 0
+        self.fg = self.bg = None
+
+    def sgr(self, params):
+        codes = [int(p) for p in params.split(";")] if params else [0]
+        i = 0
+        while i < len(codes):
+            code = codes[i]
+            if code == 0:
+                self.fg = self.bg = None
+            elif code in (38, 48):
+                length = 5 if codes[i + 1] == 2 else 3
+                color = tuple(codes[i + 1:i + length])
+                if code == 38:
+                    self.fg = color
+                else:
+                    self.bg = color
+                i += length - 1
+            elif 30 <= code <= 37 or 90 <= code <= 97:
+                self.fg = (code,)
+            elif 40 <= code <= 47 or 100 <= code <= 107:
+                self.bg = (code - 10,)
+            i += 1
+
+    def write(self, data):
+        for match in TOKEN.finditer(data.decode("utf-8")):
+            row, column, params, newline, glyph = match.groups()
+            if match.group(0).endswith("H"):
+                self.y, self.x = (int(row) - 1, int(column) - 1) if row else (0, 0)
+            elif params is not None:
+                self.sgr(params)
+            elif newline:
+                self.y, self.x = self.y + 1, 0
+            else:
+                self.cells[self.y][self.x] = (self.fg, self.bg, glyph)
+                self.x += 1
+        return self
+
+
+def make_grid(text, colors=None):
+    """CellGrid from equal-length text rows, with an optional (H, W, 3) TrueColor layer."""
+    glyphs = np.array([list(row.encode()) for row in text], dtype=np.uint8)[:, :, None]
+    layers = [] if colors is None else [SgrLayer(TRUECOLOR, colors)]
+    return CellGrid(glyphs, layers)
+
+
+def moving_frames(count, cut=None, size=(96, 128)):
+    """Gradient BGR frames with a sliding square; frame `cut` is noise."""
+    h, w = size
+    rng = np.random.default_rng(7)
+    yy, xx = np.mgrid[0:h, 0:w]
+    frames = []
+    for i in range(count):
+        frame = np.stack([xx * 2, yy * 2, (xx + yy + 8 * i) % 256], axis=2).astype(np.uint8)
+        frame[20:44, 6 + 3 * i:30 + 3 * i] = (255, 255, 255)
+        if i == cut:
+            frame = rng.integers(0, 256, frame.shape, dtype=np.uint8)
+        frames.append(frame)
+    return frames
+
+
+class DeltaTest(unittest.TestCase):
+
+    def assertSameScreen(self, tracker, grids):
+        """Encodes `grids` with `tracker` and checks the screen against a full redraw after each."""
+        h, w, _ = grids[0].glyphs.shape
+        screen = Screen(h, w)
+        outputs = []
+        for grid in grids:
+            outputs.append(tracker.encode(grid))
+            screen.write(outputs[-1])
+            self.assertEqual(screen.cells, Screen(h, w).write(encode_full_frame(grid)).cells)
+        return outputs
+
+    def test_gap_merge(self):
+        before = make_grid(["." * 40] * 3)
+        near = make_grid(["." * 40, "..#..#" + "." * 34, "." * 40])
+        far = make_grid(["." * 40, "..#" + "." * 27 + "#" + "." * 9, "." * 40])
+        for after, jumps in ((near, 1), (far, 2)):
+            with self.subTest(jumps=jumps):
+                tracker = DamageTracker(0)
+                changed = np.any(after.glyphs != before.glyphs, axis=2)
+                emit = tracker._emit_mask(changed, after)
+                self.assertEqual(int(emit.sum()) - int(changed.sum()), 2 if jumps == 1 else 0)
+                output = self.assertSameScreen(tracker, [before, after])[1]
+                self.assertEqual(len(JUMP.findall(output)), jumps)
+
+    def test_gap_merge_with_colors(self):
+        colors = np.zeros((2, 30, 3), dtype=np.uint8)
+        colors[:, 3:7] = (200, 10, 10)
+        changed_colors = colors.copy()
+        changed_colors[1, 3] = changed_colors[1, 6] = (0, 90, 0)
+        grids = [make_grid(["a" * 30] * 2, colors), make_grid(["aaabaab" + "a" * 23, "a" * 30], changed_colors)]
+        output = self.assertSameScreen(DamageTracker(0), grids)[1]
+        # Row 1 keeps the red gap in one span; in row 2 the gap would need two more color sequences
+        self.assertEqual(len(JUMP.findall(output)), 3)
+
+    def test_span_at_column_zero(self):
+        grids = [make_grid(["abcdef"] * 4), make_grid(["abcdef"] * 3 + ["Xbcdef"])]
+        output = self.assertSameScreen(DamageTracker(0), grids)[1]
+        self.assertEqual(output, b"\033[004;001HX")
+        output = self.assertSameScreen(RowTracker(0), grids)[1]
+        self.assertEqual(output, b"\033[004;001HXbcdef")
+
+    def test_scene_cut(self):
+        rng = np.random.default_rng(3)
+        steady = rng.integers(0, 256, (6, 20, 3), dtype=np.uint8)
+        cut = rng.integers(0, 256, (6, 20, 3), dtype=np.uint8)
+        grids = [make_grid(["x" * 20] * 6, steady), make_grid(["y" * 20] * 6, cut)]
+        for tracker in (DamageTracker(0), RowTracker(0)):
+            with self.subTest(tracker=type(tracker).__name__):
+                stats = Counter()
+                tracker.encode(grids[0], stats)
+                output = tracker.encode(grids[1], stats)
+                self.assertTrue(output.startswith(CURSOR_HOME))
+                self.assertTrue(tracker.keyframe)
+                self.assertEqual(stats["damage_scene_cuts"], 1)
+                self.assertEqual(stats["damage_full_frames"], 2)
+
+    def test_refresh_interval(self):
+        for interval, keyframes in ((4, [0, 4, 8]), (1, list(range(10))), (0, [0])):
+            for tracker in (DamageTracker(interval), RowTracker(interval)):
+                with self.subTest(tracker=type(tracker).__name__, interval=interval):
+                    grids = [make_grid(["." * 8, "%-8d" % i]) for i in range(10)]
+                    full = []
+                    for i, grid in enumerate(grids):
+                        tracker.encode(grid)
+                        if tracker.keyframe:
+                            full.append(i)
+                    self.assertEqual(full, keyframes)
+
+    def test_rendered_frames(self):
+        frames = moving_frames(12, cut=6)
+        for mode, colors in (("ascii", None), ("ascii", "16"), ("ascii", "256"), ("ascii", "truecolor"),
+                             ("halfblock", "truecolor"), ("halfblock", "256"), ("braille", "truecolor")):
+            reference = PixelStreamBot("x", width=32, mode=mode, colors=colors)
+            full = [reference.render_frame(frame) for frame in frames]
+            for delta in ("rows", "cells"):
+                for refresh in (0, 5):
+                    with self.subTest(mode=mode, colors=colors, delta=delta, refresh=refresh):
+                        bot = PixelStreamBot("x", width=32, mode=mode, colors=colors, delta=delta,
+                                             refresh_interval=refresh)
+                        h = full[0].count(b"\n") + 1
+                        screen = Screen(h, 32)
+                        for i, frame in enumerate(frames):
+                            screen.write(bot.render_frame(frame))
+                            self.assertEqual(screen.cells, Screen(h, 32).write(full[i]).cells, i)
+                        self.assertGreaterEqual(bot.stats["damage_scene_cuts"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
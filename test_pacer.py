@@ -0,0 +1,63 @@
+"""
+PixelStream Bot - High-Performance Terminal Media Engine.
+
+This module is part of the PixelStream architecture, designed for real-time
+ASCII rendering and stream processing with TrueColor support.
+Optimized for efficiency and low-latency execution during video playback.
+"""
+'''
+© 2026 * These are personal recreations of existing projects, developed by Ashraf Morningstar for learning and skill development.
+Original project concepts remain the intellectual property of their respective creators.
+
+https://github.com/AshrafMorningstar
+Copyright (c) 2026
+'''
+
+# Presentation clock checks for FramePacer across loop passes.
+# Run with: python -m unittest test_pacer
+
+import unittest
+
+from main import FramePacer
+
+
+class PacerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.pacer = FramePacer(0.001, spin=False)
+
+    def present(self, position):
+        index = self.pacer.next_frame(position)
+        self.pacer.wait(index)
+        return index
+
+    def test_pass_boundary_after_decoder_drops(self):
+        pacer = self.pacer
+        pacer.start_pass(0)
+        for position in range(5):
+            self.present(position)
+
+        # The decoder runs ahead and drops the end of the pass before frame 5 is taken
+        for position in range(6, 10):
+            pacer.drop(pacer.base + position)
+        self.assertEqual(self.present(5), 5)
+        self.assertEqual(pacer.frames, 10)
+
+        # The next pass starts after every slot of this one, dropped ones included
+        pacer.start_pass(0)
+        self.assertEqual(pacer.next_frame(0), 10)
+        self.assertEqual(pacer.stats["pacer_dropped"], 4)
+
+    def test_pass_boundary_with_start_offset(self):
+        pacer = self.pacer
+        pacer.start_pass(3)
+        for position in range(3, 8):
+            self.present(position)
+        pacer.drop(pacer.base + 8)
+
+        pacer.start_pass(3)
+        self.assertEqual(pacer.next_frame(3), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()